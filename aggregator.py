@@ -0,0 +1,104 @@
+from settlement import pozisyon_orani
+
+TARAFLAR = ('long', 'short')
+
+def _neumaier_ekle(durum, indeks, deger):
+
+    # durum[indeks] toplam, durum[indeks + 1] telafi terimi
+    toplam = durum[indeks]
+    yeni_toplam = toplam + deger
+    if abs(toplam) >= abs(deger):
+        durum[indeks + 1] += (toplam - yeni_toplam) + deger
+    else:
+        durum[indeks + 1] += (deger - yeni_toplam) + toplam
+    durum[indeks] = yeni_toplam
+
+class AcikPozisyonToplayici:
+    """
+    Market başına toplam long ve short notional'ı açma, kapama ve boyut değişikliği
+    olaylarıyla O(1) günceller; pozisyonlar hiçbir zaman yeniden taranmaz.
+
+    Market durumu: [long_toplam, long_telafi, short_toplam, short_telafi, long_adet, short_adet].
+    Toplamlar Neumaier telafili tutulur; bir taraftaki son pozisyon kapandığında toplam tam sıfıra çekilir.
+    """
+
+    def __init__(self):
+
+        self.durumlar = {}
+        self.pozisyonlar = {}
+
+    def _durum(self, market):
+
+        durum = self.durumlar.get(market)
+        if durum is None:
+            durum = [0.0, 0.0, 0.0, 0.0, 0, 0]
+            self.durumlar[market] = durum
+        return durum
+
+    def degistir(self, market, taraf, delta, adet_degisimi=0):
+        """
+        Bir tarafın toplamına doğrudan delta ekler; pozisyon kimliği tutmayan akışlar için.
+        Toplam yalnızca adet_degisimi < 0 olan bir kapanış adedi sıfıra indirdiğinde sıfıra çekilir;
+        adet tutmayan akışlarda (adet_degisimi=0) delta olduğu gibi birikir.
+        """
+
+        if taraf not in TARAFLAR:
+            raise ValueError(f"Geçersiz taraf: {taraf}")
+
+        durum = self._durum(market)
+        t = TARAFLAR.index(taraf)
+        _neumaier_ekle(durum, 2 * t, float(delta))
+
+        durum[4 + t] = max(durum[4 + t] + adet_degisimi, 0)
+        if adet_degisimi < 0 and durum[4 + t] == 0:
+            durum[2 * t] = 0.0
+            durum[2 * t + 1] = 0.0
+
+    def ac(self, market, pozisyon_id, taraf, notional):
+
+        if pozisyon_id in self.pozisyonlar:
+            raise ValueError(f"{pozisyon_id} zaten açık")
+        if notional < 0:
+            raise ValueError("notional negatif olamaz")
+
+        self.degistir(market, taraf, notional, 1)
+        self.pozisyonlar[pozisyon_id] = [market, taraf, float(notional)]
+
+    def kapat(self, pozisyon_id):
+
+        market, taraf, notional = self.pozisyonlar.pop(pozisyon_id)
+        self.degistir(market, taraf, -notional, -1)
+
+    def boyutlandir(self, pozisyon_id, yeni_notional):
+
+        if yeni_notional < 0:
+            raise ValueError("notional negatif olamaz")
+
+        pozisyon = self.pozisyonlar[pozisyon_id]
+        self.degistir(pozisyon[0], pozisyon[1], yeni_notional - pozisyon[2])
+        pozisyon[2] = float(yeni_notional)
+
+    def toplamlar(self, market):
+        """
+        (long_toplam, short_toplam) notional değerleri.
+        """
+
+        durum = self.durumlar.get(market)
+        if durum is None:
+            return 0.0, 0.0
+        return max(durum[0] + durum[1], 0.0), max(durum[2] + durum[3], 0.0)
+
+    def oran(self, market):
+        """
+        0-1 konvansiyonunda pozisyon oranı (0 = tam short, 1 = tam long), boş markette 0.5.
+        """
+
+        return pozisyon_orani(*self.toplamlar(market))
+
+    def tick(self, zaman, market):
+        """
+        CanliKesimTakipcisi.isle için (zaman, market, long_oi, short_oi) tick'i.
+        """
+
+        long_toplam, short_toplam = self.toplamlar(market)
+        return zaman, market, long_toplam, short_toplam
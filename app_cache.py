@@ -0,0 +1,189 @@
+import json
+
+import numpy as np
+import streamlit as st
+
+from curve_functions import (
+    EGRI_PARAMETRELERI,
+    onbellekli_cift_s_curve,
+    uyarlamali_ornekleme,
+    gecis_bolgesi_bilgilerini_hesapla,
+    kesin_istatistikleri_hesapla,
+    funding_bolgeleri_analizi,
+    kritik_seviyeleri_hesapla,
+    senaryolari_karsilastir,
+    cap_etkisi_analizi,
+    duyarlilik_analizi_uret_yeni
+)
+from visualization import (
+    ana_grafigi_olustur_yeni,
+    gecis_bolgesi_detay_grafigi_yeni,
+    karsilastirma_grafigi_olustur_yeni,
+    cap_etkisi_grafigi,
+    parametre_duyarlilik_grafigi_yeni
+)
+
+# Sayısal sonuçlar oturumlar arasında paylaşılır; her isabette kopya döner
+VERI_ONBELLEK_BOYUTU = 64
+# Grafikler tek nesne olarak paylaşılır, çağıran taraf değiştirmemeli
+GRAFIK_ONBELLEK_BOYUTU = 16
+
+MEVCUT_SENARYO = "Mevcut Ayarlar"
+
+def _normalize_et(deger):
+
+    if isinstance(deger, dict):
+        return {str(anahtar): _normalize_et(deger[anahtar]) for anahtar in sorted(deger)}
+    if isinstance(deger, (list, tuple)):
+        return [_normalize_et(eleman) for eleman in deger]
+    if isinstance(deger, (bool, str)) or deger is None:
+        return deger
+    if isinstance(deger, (int, np.integer)):
+        return int(deger)
+    if isinstance(deger, (float, np.floating)):
+        # -0.0 ve 0.0 aynı anahtarı vermeli
+        return float(deger) + 0.0
+    return str(deger)
+
+def _parametre_ozeti(parametreler):
+
+    ozet = {anahtar: _normalize_et(parametreler[anahtar]) for anahtar in EGRI_PARAMETRELERI}
+    ozet['funding_bolgeleri'] = _normalize_et(parametreler.get('funding_bolgeleri', []))
+    return ozet
+
+def parametre_goruntusu(parametreler):
+    """
+    Eğri parametreleri ve funding bölgelerinden kanonik, değişmez JSON anahtarı.
+    kritik_seviyeler gibi türetilmiş alanlar dahil edilmez.
+    """
+
+    return json.dumps(_parametre_ozeti(parametreler), sort_keys=True, separators=(',', ':'))
+
+def senaryo_goruntusu(senaryolar):
+
+    ozetler = {}
+    for isim, senaryo in senaryolar.items():
+        parametreler = senaryo.get('parametreler', senaryo)
+        try:
+            ozetler[isim] = _parametre_ozeti(parametreler)
+        except KeyError:
+            # Eksik senaryo karşılaştırmada atlanır; anahtarda ham haliyle kalır
+            ozetler[isim] = _normalize_et(parametreler)
+    return json.dumps(ozetler, sort_keys=True, separators=(',', ':'))
+
+def _cozumle(goruntu):
+
+    return json.loads(goruntu)
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def ornekleme_izgarasi(goruntu, cozunurluk=500):
+    """
+    Eğri, cap ve karşılaştırma grafiklerinin ortak x ızgarası: cozunurluk kadar eğriliğe göre yerleşmiş nokta.
+    """
+
+    return uyarlamali_ornekleme(_cozumle(goruntu), cozunurluk)
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def egri_verileri(goruntu, cozunurluk=500):
+
+    x_degerleri = ornekleme_izgarasi(goruntu, cozunurluk)
+    combined_curve, short_curve, long_curve = onbellekli_cift_s_curve(x_degerleri, _cozumle(goruntu))
+    return x_degerleri, combined_curve, short_curve, long_curve
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def gecis_bilgileri(goruntu):
+
+    return gecis_bolgesi_bilgilerini_hesapla(_cozumle(goruntu))
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def istatistikler(goruntu):
+
+    return kesin_istatistikleri_hesapla(_cozumle(goruntu))
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def bolge_analizleri(goruntu):
+
+    parametreler = _cozumle(goruntu)
+    return funding_bolgeleri_analizi(parametreler.get('funding_bolgeleri', []), parametreler)
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def kritik_seviyeler(goruntu):
+
+    return kritik_seviyeleri_hesapla(_cozumle(goruntu))
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def senaryo_karsilastirmasi(goruntu, senaryolar_goruntusu, cozunurluk=500):
+
+    senaryolar = {MEVCUT_SENARYO: _cozumle(goruntu)}
+    senaryolar.update(_cozumle(senaryolar_goruntusu))
+    x_degerleri = ornekleme_izgarasi(goruntu, cozunurluk)
+    return senaryolari_karsilastir(senaryolar, x_degerleri, referans=MEVCUT_SENARYO)
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def cap_analizi(goruntu, cozunurluk=500):
+
+    parametreler = _cozumle(goruntu)
+    x_degerleri = ornekleme_izgarasi(goruntu, cozunurluk)
+    return cap_etkisi_analizi(x_degerleri, parametreler, parametreler['min_cap'], parametreler['max_cap'])
+
+@st.cache_data(max_entries=VERI_ONBELLEK_BOYUTU, show_spinner=False)
+def duyarlilik_analizi(goruntu, parametre_ismi, varyasyon_degerleri, cozunurluk=500):
+
+    # Varyasyonlar temel eğriyle aynı ızgarada çizilir
+    x_degerleri = ornekleme_izgarasi(goruntu, cozunurluk)
+    return duyarlilik_analizi_uret_yeni(
+        _cozumle(goruntu), parametre_ismi, np.array(varyasyon_degerleri), x_degerleri
+    )
+
+@st.cache_resource(max_entries=GRAFIK_ONBELLEK_BOYUTU, show_spinner=False)
+def ana_grafik(goruntu, cozunurluk=500):
+
+    parametreler = _cozumle(goruntu)
+    x_degerleri, combined_curve, _, _ = egri_verileri(goruntu, cozunurluk)
+    bilgiler = gecis_bilgileri(goruntu)
+    return ana_grafigi_olustur_yeni(
+        x_degerleri,
+        combined_curve,
+        parametreler.get('funding_bolgeleri'),
+        bilgiler['baslangic'],
+        bilgiler['bitis'],
+        parametreler['min_cap'],
+        parametreler['max_cap']
+    )
+
+@st.cache_resource(max_entries=GRAFIK_ONBELLEK_BOYUTU, show_spinner=False)
+def gecis_grafigi(goruntu, cozunurluk=500):
+
+    x_degerleri, combined_curve, _, _ = egri_verileri(goruntu, cozunurluk)
+    return gecis_bolgesi_detay_grafigi_yeni(x_degerleri, combined_curve, gecis_bilgileri(goruntu))
+
+@st.cache_resource(max_entries=GRAFIK_ONBELLEK_BOYUTU, show_spinner=False)
+def karsilastirma_grafigi(goruntu, senaryolar_goruntusu, secilenler, cozunurluk=500):
+
+    karsilastirma = senaryo_karsilastirmasi(goruntu, senaryolar_goruntusu, cozunurluk)
+    return karsilastirma_grafigi_olustur_yeni(
+        karsilastirma['x_degerleri'], {isim: karsilastirma['egriler'][isim] for isim in secilenler}
+    )
+
+@st.cache_resource(max_entries=GRAFIK_ONBELLEK_BOYUTU, show_spinner=False)
+def cap_grafigi(goruntu, cozunurluk=500):
+
+    parametreler = _cozumle(goruntu)
+    analiz = cap_analizi(goruntu, cozunurluk)
+    return cap_etkisi_grafigi(
+        ornekleme_izgarasi(goruntu, cozunurluk),
+        analiz['orijinal_curve'],
+        analiz['capli_curve'],
+        parametreler['min_cap'],
+        parametreler['max_cap']
+    )
+
+@st.cache_resource(max_entries=GRAFIK_ONBELLEK_BOYUTU, show_spinner=False)
+def duyarlilik_grafigi(goruntu, parametre_ismi, varyasyon_degerleri, parametre_etiketi, cozunurluk=500):
+
+    x_degerleri, combined_curve, _, _ = egri_verileri(goruntu, cozunurluk)
+    return parametre_duyarlilik_grafigi_yeni(
+        x_degerleri, combined_curve,
+        duyarlilik_analizi(goruntu, parametre_ismi, varyasyon_degerleri, cozunurluk),
+        parametre_etiketi
+    )
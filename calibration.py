@@ -0,0 +1,226 @@
+import numpy as np
+
+from config import ARAYUZ_AYARLARI
+from curve_functions import EGRI_PARAMETRELERI, FundingCurve, parametreleri_dogrula_yeni
+
+(_SMIN, _SMAX, _SORTA, _SDIK, _LMIN, _LMAX, _LORTA, _LDIK, _GECIS, _MINCAP, _MAXCAP) = range(len(EGRI_PARAMETRELERI))
+
+# Kalibrasyonda diklik tam sıfıra inmez: sıfırda eğri lineer formüle geçer ve türev süreksizleşir
+MIN_DIKLIK = 1e-6
+MIN_ARALIK = 1e-9
+
+def _parametre_sinirlari():
+
+    ayarlar = ARAYUZ_AYARLARI['number_input_ayarlari']
+    sinir_tipleri = {
+        'short_min_oran': 'oran', 'short_max_oran': 'oran', 'long_min_oran': 'oran', 'long_max_oran': 'oran',
+        'short_orta_nokta': 'orta_nokta', 'long_orta_nokta': 'orta_nokta',
+        'short_diklik': 'diklik', 'long_diklik': 'diklik',
+        'gecis_genisligi': 'gecis_genisligi', 'min_cap': 'cap_deger', 'max_cap': 'cap_deger'
+    }
+    alt = np.array([ayarlar[sinir_tipleri[anahtar]]['min_value'] for anahtar in EGRI_PARAMETRELERI], dtype=float)
+    ust = np.array([ayarlar[sinir_tipleri[anahtar]]['max_value'] for anahtar in EGRI_PARAMETRELERI], dtype=float)
+    alt[[_SDIK, _LDIK]] = np.maximum(alt[[_SDIK, _LDIK]], MIN_DIKLIK)
+    return alt, ust
+
+def _yansit(theta, alt, ust):
+    """
+    Parametreleri arayüz sınırlarına ve parametreleri_dogrula_yeni kısıtlarına geri yansıtır.
+    """
+
+    theta = np.clip(theta, alt, ust)
+    for i, j in ((_SMIN, _SMAX), (_LMIN, _LMAX), (_MINCAP, _MAXCAP)):
+        if theta[i] > theta[j] - MIN_ARALIK:
+            orta = (theta[i] + theta[j]) / 2
+            theta[i], theta[j] = orta - MIN_ARALIK, orta + MIN_ARALIK
+    return theta
+
+def _dal_ve_turevleri(x, min_oran, max_oran, orta_nokta, diklik):
+
+    # S(x) = c + a * tanh(2k(x - o)); döner: değer, x'e göre türev, (min, max, orta, diklik) türevleri
+    a = (max_oran - min_oran) / 2
+    t = np.tanh(2 * diklik * (x - orta_nokta))
+    sech2 = 1 - t * t
+    deger = (min_oran + max_oran) / 2 + a * t
+    egim = a * sech2 * 2 * diklik
+    turevler = (0.5 - 0.5 * t, 0.5 + 0.5 * t, -egim, a * sech2 * 2 * (x - orta_nokta))
+    return deger, egim, turevler
+
+def _model_ve_jakobyen(theta, x):
+    """
+    Eğri değerleri ve (n, 11) analitik jakobyen. Kırpılan noktalarda yalnızca ilgili cap'in türevi 1'dir.
+    """
+
+    g = theta[_GECIS]
+    gb, gbit = 0.5 - g / 2, 0.5 + g / 2
+
+    sol = x <= gb
+    sag = x >= gbit
+    orta = ~(sol | sag)
+
+    deger = np.empty_like(x)
+    jakobyen = np.zeros((len(x), len(theta)))
+
+    s_deger, _, s_turev = _dal_ve_turevleri(x[sol], *theta[_SMIN:_SDIK + 1])
+    deger[sol] = s_deger
+    for k, turev in enumerate(s_turev):
+        jakobyen[sol, _SMIN + k] = turev
+
+    l_deger, _, l_turev = _dal_ve_turevleri(x[sag], *theta[_LMIN:_LDIK + 1])
+    deger[sag] = l_deger
+    for k, turev in enumerate(l_turev):
+        jakobyen[sag, _LMIN + k] = turev
+
+    if orta.any():
+        # T(x) = (1 - u) * S_short(gb) + u * S_long(gbit), u = (x - gb) / g
+        u = (x[orta] - gb) / g
+        sg, sg_egim, sg_turev = _dal_ve_turevleri(np.array(gb), *theta[_SMIN:_SDIK + 1])
+        lg, lg_egim, lg_turev = _dal_ve_turevleri(np.array(gbit), *theta[_LMIN:_LDIK + 1])
+
+        deger[orta] = (1 - u) * sg + u * lg
+        for k in range(4):
+            jakobyen[orta, _SMIN + k] = (1 - u) * sg_turev[k]
+            jakobyen[orta, _LMIN + k] = u * lg_turev[k]
+        # gb = 0.5 - g/2, gbit = 0.5 + g/2, du/dg = (0.5 - u) / g
+        jakobyen[orta, _GECIS] = (-(1 - u) * sg_egim + u * lg_egim) / 2 + (0.5 - u) / g * (lg - sg)
+
+    alt_kesik = deger < theta[_MINCAP]
+    ust_kesik = deger > theta[_MAXCAP]
+    kesik = alt_kesik | ust_kesik
+    jakobyen[kesik] = 0.0
+    jakobyen[alt_kesik, _MINCAP] = 1.0
+    jakobyen[ust_kesik, _MAXCAP] = 1.0
+    np.clip(deger, theta[_MINCAP], theta[_MAXCAP], out=deger)
+
+    return deger, jakobyen
+
+def _baslangic_tahminleri(x, y, diklikler=(2.0, 8.0, 25.0)):
+    """
+    Veriden başlangıç noktaları: dal aralıkları gözlenen değerlerden biraz geniş,
+    orta noktalar dal ortalamasının kesildiği pozisyon, cap'ler verinin hemen dışında.
+    Farklı diklik değerleriyle birkaç başlangıç üretilir.
+    """
+
+    aralik = max(np.ptp(y), 1e-6)
+    tahmin = {
+        'gecis_genisligi': 0.05,
+        'min_cap': y.min() - 1e-3 * aralik,
+        'max_cap': y.max() + 1e-3 * aralik
+    }
+
+    for dal, secim in (('short', x <= 0.5), ('long', x >= 0.5)):
+        xs, ys = (x[secim], y[secim]) if secim.any() else (x, y)
+        dal_araligi = max(np.ptp(ys), 1e-6)
+        tahmin[f'{dal}_min_oran'] = ys.min() - 0.1 * dal_araligi
+        tahmin[f'{dal}_max_oran'] = ys.max() + 0.1 * dal_araligi
+        tahmin[f'{dal}_orta_nokta'] = float(xs[np.argmin(np.abs(ys - (ys.min() + ys.max()) / 2))])
+
+    return [dict(tahmin, short_diklik=diklik, long_diklik=diklik) for diklik in diklikler]
+
+def _levenberg_marquardt(theta, x, y, w, serbest, alt, ust, max_iterasyon, tolerans):
+
+    def artiklar(theta):
+        deger, jakobyen = _model_ve_jakobyen(theta, x)
+        return (deger - y) * w, jakobyen[:, serbest] * w[:, None]
+
+    r, J = artiklar(theta)
+    maliyet = r @ r
+    lam = 1e-3
+    yakinsadi = False
+
+    for iterasyon in range(1, max_iterasyon + 1):
+        A = J.T @ J
+        gradyan = J.T @ r
+        kosegen = np.diag(A).copy()
+        kosegen[kosegen == 0] = 1.0
+
+        while True:
+            try:
+                adim = np.linalg.solve(A + lam * np.diag(kosegen), -gradyan)
+            except np.linalg.LinAlgError:
+                lam *= 10
+                continue
+
+            yeni_theta = theta.copy()
+            yeni_theta[serbest] += adim
+            yeni_theta = _yansit(yeni_theta, alt, ust)
+            yeni_r, yeni_J = artiklar(yeni_theta)
+            yeni_maliyet = yeni_r @ yeni_r
+
+            if yeni_maliyet < maliyet or lam > 1e12:
+                break
+            lam *= 4
+
+        # Hiçbir sönümleme maliyeti düşürmüyorsa yerel minimumdayız
+        if yeni_maliyet >= maliyet:
+            yakinsadi = True
+            break
+
+        lam = max(lam / 3, 1e-12)
+        iyilesme = maliyet - yeni_maliyet
+        theta, r, J, maliyet = yeni_theta, yeni_r, yeni_J, yeni_maliyet
+        if iyilesme <= tolerans * maliyet or maliyet == 0:
+            yakinsadi = True
+            break
+
+    return theta, maliyet, iterasyon, yakinsadi
+
+def egriyi_kalibre_et(pozisyonlar, hedef_oranlar, baslangic=None, sabitler=(), agirliklar=None,
+                      max_iterasyon=150, tolerans=1e-10):
+    """
+    On bir eğri parametresini (pozisyon, funding) örneklerine Levenberg-Marquardt ile uydurur.
+    Veriden türetilen birkaç başlangıç (ve verildiyse baslangic) denenir, en düşük hatalı sonuç seçilir.
+    sabitler: baslangic'taki değerinde tutulacak parametre isimleri.
+    funding_bolgeleri gibi eğri dışı anahtarlar baslangic'tan aynen korunur.
+    """
+
+    x = np.asarray(pozisyonlar, dtype=float).ravel()
+    y = np.asarray(hedef_oranlar, dtype=float).ravel()
+    if x.shape != y.shape or len(x) == 0:
+        raise ValueError("pozisyonlar ve hedef_oranlar aynı uzunlukta ve boş olmayan diziler olmalı")
+
+    w = np.ones_like(x) if agirliklar is None else np.sqrt(np.asarray(agirliklar, dtype=float).ravel())
+
+    bilinmeyenler = [anahtar for anahtar in sabitler if anahtar not in EGRI_PARAMETRELERI]
+    if bilinmeyenler:
+        raise ValueError(f"Bilinmeyen parametre: {', '.join(bilinmeyenler)}")
+    if sabitler and baslangic is None:
+        raise ValueError("Sabit parametreler için baslangic değerleri verilmeli")
+
+    serbest = np.array([anahtar not in sabitler for anahtar in EGRI_PARAMETRELERI])
+    alt, ust = _parametre_sinirlari()
+
+    adaylar = _baslangic_tahminleri(x, y)
+    if baslangic is not None:
+        # Sabit parametreler her adayda baslangic'taki değerini alır
+        adaylar = [baslangic] + [
+            dict(aday, **{anahtar: baslangic[anahtar] for anahtar in sabitler}) for aday in adaylar
+        ]
+
+    en_iyi = None
+    for aday in adaylar:
+        theta = _yansit(np.array([float(aday[anahtar]) for anahtar in EGRI_PARAMETRELERI]), alt, ust)
+        sonuc = _levenberg_marquardt(theta, x, y, w, serbest, alt, ust, max_iterasyon, tolerans)
+        if en_iyi is None or sonuc[1] < en_iyi[1]:
+            en_iyi = sonuc
+    theta, _, iterasyon, yakinsadi = en_iyi
+
+    parametreler = dict(baslangic or {})
+    parametreler.update({anahtar: float(deger) for anahtar, deger in zip(EGRI_PARAMETRELERI, theta)})
+
+    artik = FundingCurve(parametreler).hesapla(x) - y
+    return {
+        'parametreler': parametreler,
+        'rmse': float(np.sqrt(np.mean(artik * artik))),
+        'max_hata': float(np.abs(artik).max()),
+        'iterasyon': iterasyon,
+        'yakinsadi': yakinsadi,
+        'hatalar': parametreleri_dogrula_yeni(parametreler)
+    }
+
+def kesimlerden_kalibre_et(kesimler, baslangic=None, **secenekler):
+    """
+    funding_kesimlerini_oynat çıktısı gibi geçmiş kesimlerden (oranlar, funding_oranlari) kalibrasyon.
+    """
+
+    return egriyi_kalibre_et(kesimler['oranlar'], kesimler['funding_oranlari'], baslangic, **secenekler)
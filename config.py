@@ -70,13 +70,16 @@ ARAYUZ_AYARLARI = {
     'sidebar_genisligi': 350,
     'ana_grafik_yuksekligi': 600,
     'istatistik_yuksekligi': 300,
+    # Çizgi izleri bu kadar yatay piksele göre seyreltilir
+    'grafik_piksel_genisligi': 1200,
     'number_input_ayarlari': {
         'oran': {'min_value': -10.000000, 'max_value': 10.000000, 'step': 0.000001, 'format': "%.6f"},
         'orta_nokta': {'min_value': 0.000000, 'max_value': 1.000000, 'step': 0.000001, 'format': "%.6f"},
         'diklik': {'min_value': 0.000000, 'max_value': 50.000000, 'step': 0.000001, 'format': "%.6f"},
         'gecis_genisligi': {'min_value': 0.000001, 'max_value': 0.999999, 'step': 0.000001, 'format': "%.6f"},
         'cap_deger': {'min_value': -10.000000, 'max_value': 10.000000, 'step': 0.000001, 'format': "%.6f"},
-        'saat': {'min_value': 1, 'max_value': 168, 'step': 1, 'format': "%d"}
+        'saat': {'min_value': 1, 'max_value': 168, 'step': 1, 'format': "%d"},
+        'cozunurluk': {'min_value': 50, 'max_value': 5000, 'step': 50, 'format': "%d"}
     }
 }
 
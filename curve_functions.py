@@ -1,7 +1,17 @@
 
 
+import hashlib
+import math
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 
+# np.trapezoid NumPy 2.0 ile geldi; 1.x kurulumlarda np.trapz kullanılır
+_trapez = getattr(np, 'trapezoid', None) or np.trapz
+
 def s_curve_min_max_ile(x, min_oran, max_oran, orta_nokta=0.5, diklik=1.0):
 
     if diklik == 0:
@@ -24,77 +34,878 @@ def cap_uygula(degerler, min_cap, max_cap):
 
     return np.clip(degerler, min_cap, max_cap)
 
+def _s_curve_yaz(x, min_oran, max_oran, orta_nokta, diklik, out):
+
+    # s_curve_min_max_ile ile aynı işlem sırası, ara dizi yerine out kullanılır
+    if diklik == 0:
+        np.multiply(x, max_oran - min_oran, out=out)
+        out += min_oran
+        return out
+    
+    np.subtract(x, orta_nokta, out=out)
+    out *= 2
+    out *= diklik
+    np.tanh(out, out=out)
+    out *= (max_oran - min_oran) / 2
+    out += (min_oran + max_oran) / 2
+    return out
+
+def _cikti_dizisi(dizi, sekil, dtype):
+
+    if dizi is None:
+        return np.empty(sekil, dtype=dtype)
+    if dizi.shape != sekil or dizi.dtype != dtype:
+        raise ValueError(f"Çıktı dizisi {sekil} boyutunda ve {dtype} tipinde olmalı")
+    return dizi
+
 def cift_s_curve_sistemi_yeni(x, 
                              short_min_oran, short_max_oran, short_orta_nokta, short_diklik,
                              long_min_oran, long_max_oran, long_orta_nokta, long_diklik,
-                             gecis_genisligi, min_cap, max_cap):
+                             gecis_genisligi, min_cap, max_cap, out=None, dtype=None, tampon=None):
+    """
+    out: (sonuc, short_curve, long_curve) için önceden ayrılmış diziler, tekrar eden
+    hesaplarda bellek yeniden kullanılır. dtype verilmezse x'in float tipi kullanılır.
+    tampon: geçiş ara dizisi ve maske için EgriTamponu; out ile birlikte verilirse hiç dizi ayrılmaz.
+    """
 
+    x = np.asarray(x)
+    if dtype is None:
+        dtype = x.dtype if np.issubdtype(x.dtype, np.floating) else np.float64
+    dtype = np.dtype(dtype)
+    if x.dtype != dtype:
+        x = x.astype(dtype)
+    
+    if out is None:
+        out = (None, None, None)
+    sonuc, short_curve, long_curve = (_cikti_dizisi(dizi, x.shape, dtype) for dizi in out)
     
     gecis_merkez = 0.5
     gecis_baslangic = gecis_merkez - gecis_genisligi / 2
     gecis_bitis = gecis_merkez + gecis_genisligi / 2
     
     
-    short_curve = s_curve_min_max_ile(x, short_min_oran, short_max_oran, 
-                                     short_orta_nokta, short_diklik)
+    _s_curve_yaz(x, short_min_oran, short_max_oran, short_orta_nokta, short_diklik, short_curve)
+    _s_curve_yaz(x, long_min_oran, long_max_oran, long_orta_nokta, long_diklik, long_curve)
     
     
-    long_curve = s_curve_min_max_ile(x, long_min_oran, long_max_oran, 
-                                    long_orta_nokta, long_diklik)
+    if tampon is None:
+        tampon = EgriTamponu(x.size, dtype)
+    elif tampon.dtype != dtype:
+        raise ValueError(f"Tampon tipi {tampon.dtype}, eğri tipi {dtype}")
+    ara, mask = tampon.al(x.shape)
     
+    # FundingCurve._tamponla_hesapla ile aynı sıra: short, x > baslangic'ta geçiş, x >= bitis'te long
+    np.copyto(sonuc, short_curve)
     
-    sonuc = np.zeros_like(x)
-    
-    
-    sol_mask = x <= gecis_baslangic
-    sonuc[sol_mask] = short_curve[sol_mask]
-    
-    
-    sag_mask = x >= gecis_bitis
-    sonuc[sag_mask] = long_curve[sag_mask]
-    
-    
-    orta_mask = (x > gecis_baslangic) & (x < gecis_bitis)
-    if np.any(orta_mask):
-        
+    if gecis_genisligi > 0:
         short_deger = s_curve_min_max_ile(gecis_baslangic, short_min_oran, short_max_oran, 
                                          short_orta_nokta, short_diklik)
         long_deger = s_curve_min_max_ile(gecis_bitis, long_min_oran, long_max_oran, 
                                         long_orta_nokta, long_diklik)
         
-        
-        t = (x[orta_mask] - gecis_baslangic) / gecis_genisligi
-        sonuc[orta_mask] = short_deger + t * (long_deger - short_deger)
+        np.subtract(x, gecis_baslangic, out=ara)
+        ara *= (long_deger - short_deger) / gecis_genisligi
+        ara += short_deger
+        np.greater(x, gecis_baslangic, out=mask)
+        np.copyto(sonuc, ara, where=mask)
     
+    np.greater_equal(x, gecis_bitis, out=mask)
+    np.copyto(sonuc, long_curve, where=mask)
     
-    sonuc = cap_uygula(sonuc, min_cap, max_cap)
-    short_curve = cap_uygula(short_curve, min_cap, max_cap)
-    long_curve = cap_uygula(long_curve, min_cap, max_cap)
+    
+    np.clip(sonuc, min_cap, max_cap, out=sonuc)
+    np.clip(short_curve, min_cap, max_cap, out=short_curve)
+    np.clip(long_curve, min_cap, max_cap, out=long_curve)
     
     return sonuc, short_curve, long_curve
 
-def belirli_pozisyondaki_funding_hesapla(pozisyon, parametreler):
+EGRI_PARAMETRELERI = (
+    'short_min_oran', 'short_max_oran', 'short_orta_nokta', 'short_diklik',
+    'long_min_oran', 'long_max_oran', 'long_orta_nokta', 'long_diklik',
+    'gecis_genisligi', 'min_cap', 'max_cap'
+)
+
+class EgriTamponu:
+    """
+    FundingCurve.hesapla için yeniden kullanılabilir ara bellek.
+    Kapasiteye kadar her boyuttaki pozisyon dizisi için görünüm verir.
+    """
+
+    def __init__(self, kapasite, dtype=np.float64):
+
+        self.kapasite = int(kapasite)
+        self.dtype = np.dtype(dtype)
+        self._ara = np.empty(self.kapasite, dtype=self.dtype)
+        self._mask = np.empty(self.kapasite, dtype=bool)
+
+    def al(self, sekil):
+
+        boyut = math.prod(sekil)
+        if boyut > self.kapasite:
+            raise ValueError(f"Tampon kapasitesi ({self.kapasite}) {boyut} eleman için yetersiz")
+        return self._ara[:boyut].reshape(sekil), self._mask[:boyut].reshape(sekil)
+
+class FundingCurve:
+    """
+    Aynı parametre seti için tekrar tekrar hesaplanan çift S-curve.
+    Sabitler bir kez hesaplanır, her pozisyon yalnızca kendi formülüyle değerlendirilir.
+    """
+
+    def __init__(self, parametreler, dtype=np.float64):
+
+        self.dtype = np.dtype(dtype)
+
+        self.short_min_oran = float(parametreler['short_min_oran'])
+        self.short_max_oran = float(parametreler['short_max_oran'])
+        self.short_orta_nokta = float(parametreler['short_orta_nokta'])
+        self.short_diklik = float(parametreler['short_diklik'])
+        self.long_min_oran = float(parametreler['long_min_oran'])
+        self.long_max_oran = float(parametreler['long_max_oran'])
+        self.long_orta_nokta = float(parametreler['long_orta_nokta'])
+        self.long_diklik = float(parametreler['long_diklik'])
+        self.gecis_genisligi = float(parametreler['gecis_genisligi'])
+        self.min_cap = float(parametreler['min_cap'])
+        self.max_cap = float(parametreler['max_cap'])
+
+        self.gecis_baslangic = 0.5 - self.gecis_genisligi / 2
+        self.gecis_bitis = 0.5 + self.gecis_genisligi / 2
+
+        self.short_orta_deger = (self.short_min_oran + self.short_max_oran) / 2
+        self.short_aralik = (self.short_max_oran - self.short_min_oran) / 2
+        self.long_orta_deger = (self.long_min_oran + self.long_max_oran) / 2
+        self.long_aralik = (self.long_max_oran - self.long_min_oran) / 2
+
+        self.short_gecis_degeri = self._short_deger(self.gecis_baslangic)
+        self.long_gecis_degeri = self._long_deger(self.gecis_bitis)
+        self.gecis_farki = self.long_gecis_degeri - self.short_gecis_degeri
+
+        self.bolge_indeksi = BolgeIndeksi(parametreler.get('funding_bolgeleri', []))
+
+    def _short_yaz(self, x, out):
+
+        return _s_curve_yaz(x, self.short_min_oran, self.short_max_oran,
+                            self.short_orta_nokta, self.short_diklik, out)
+
+    def _long_yaz(self, x, out):
+
+        return _s_curve_yaz(x, self.long_min_oran, self.long_max_oran,
+                            self.long_orta_nokta, self.long_diklik, out)
+
+    def _short_hesapla(self, x):
+
+        return self._short_yaz(x, np.empty_like(x))
+
+    def _long_hesapla(self, x):
+
+        return self._long_yaz(x, np.empty_like(x))
+
+    def _short_deger(self, x):
+
+        if self.short_diklik == 0:
+            return self.short_min_oran + (self.short_max_oran - self.short_min_oran) * x
+        return self.short_orta_deger + self.short_aralik * math.tanh(
+            self.short_diklik * (2 * (x - self.short_orta_nokta)))
+
+    def _long_deger(self, x):
+
+        if self.long_diklik == 0:
+            return self.long_min_oran + (self.long_max_oran - self.long_min_oran) * x
+        return self.long_orta_deger + self.long_aralik * math.tanh(
+            self.long_diklik * (2 * (x - self.long_orta_nokta)))
+
+    def hesapla(self, x, out=None, tampon=None):
+        """
+        out verilirse sonuç oraya yazılır. tampon (EgriTamponu) verilirse ara dizi ve maske
+        oradan alınır ve hiç geçici dizi ayrılmaz; verilmezse bu çağrı için bir tane ayrılır.
+        """
+
+        x = np.asarray(x)
+        if x.dtype != self.dtype:
+            x = x.astype(self.dtype)
+        sonuc = _cikti_dizisi(out, x.shape, self.dtype)
+
+        if tampon is None:
+            tampon = EgriTamponu(x.size, self.dtype)
+        return self._tamponla_hesapla(x, sonuc, tampon)
+
+    def _tamponla_hesapla(self, x, sonuc, tampon):
+
+        if tampon.dtype != self.dtype:
+            raise ValueError(f"Tampon tipi {tampon.dtype}, eğri tipi {self.dtype}")
+        ara, mask = tampon.al(x.shape)
+
+        # Parçalar sırayla üzerine yazılır: short her yerde, geçiş x > baslangic, long x >= bitis.
+        # Böylece tek maske yeter, dizi toplama/dağıtma yapılmaz.
+        self._short_yaz(x, sonuc)
+
+        if self.gecis_genisligi > 0:
+            np.subtract(x, self.gecis_baslangic, out=ara)
+            ara *= self.gecis_farki / self.gecis_genisligi
+            ara += self.short_gecis_degeri
+            np.greater(x, self.gecis_baslangic, out=mask)
+            np.copyto(sonuc, ara, where=mask)
+
+        self._long_yaz(x, ara)
+        np.greater_equal(x, self.gecis_bitis, out=mask)
+        np.copyto(sonuc, ara, where=mask)
+
+        np.clip(sonuc, self.min_cap, self.max_cap, out=sonuc)
+        return sonuc
+
+    def deger(self, pozisyon):
+
+        x = float(pozisyon)
+
+        if x >= self.gecis_bitis:
+            sonuc = self._long_deger(x)
+        elif x > self.gecis_baslangic:
+            t = (x - self.gecis_baslangic) / self.gecis_genisligi
+            sonuc = self.short_gecis_degeri + t * self.gecis_farki
+        else:
+            sonuc = self._short_deger(x)
+
+        return min(max(sonuc, self.min_cap), self.max_cap)
+
+    def funding_ve_saat(self, pozisyon):
+
+        return self.deger(pozisyon), self.bolge_indeksi.saat(pozisyon)
+
+    def funding_saat_ve_bolge(self, pozisyon):
+
+        bolge_id = self.bolge_indeksi.bul(pozisyon)
+        saat = self.bolge_indeksi.bolgeler[bolge_id]['saat'] if bolge_id >= 0 else self.bolge_indeksi.varsayilan_saat
+        return self.deger(pozisyon), saat, bolge_id
+
+    def _dal_sabitleri(self, dal):
+
+        if dal == 'short':
+            return (self.short_min_oran, self.short_max_oran, self.short_orta_nokta,
+                    self.short_diklik, self.short_orta_deger, self.short_aralik)
+        return (self.long_min_oran, self.long_max_oran, self.long_orta_nokta,
+                self.long_diklik, self.long_orta_deger, self.long_aralik)
+
+    def _dal_araliklari(self):
+
+        araliklar = [
+            ('short', 0.0, min(self.gecis_baslangic, 1.0)),
+            ('gecis', max(self.gecis_baslangic, 0.0), min(self.gecis_bitis, 1.0)),
+            ('long', max(self.gecis_bitis, 0.0), 1.0)
+        ]
+        return [(dal, a, b) for dal, a, b in araliklar if b > a]
+
+    def _dal_hesapla(self, dal, x):
+
+        if dal == 'short':
+            return self._short_hesapla(x)
+        if dal == 'long':
+            return self._long_hesapla(x)
+        return self.short_gecis_degeri + (x - self.gecis_baslangic) / self.gecis_genisligi * self.gecis_farki
+
+    def _dal_degeri(self, dal, x):
+
+        if dal == 'short':
+            return self._short_deger(x)
+        if dal == 'long':
+            return self._long_deger(x)
+        return self.short_gecis_degeri + (x - self.gecis_baslangic) / self.gecis_genisligi * self.gecis_farki
+
+    def _dal_tersi(self, dal, y):
+
+        if dal == 'gecis':
+            if self.gecis_farki == 0:
+                return None
+            return self.gecis_baslangic + (y - self.short_gecis_degeri) / self.gecis_farki * self.gecis_genisligi
+
+        min_oran, max_oran, orta_nokta, diklik, orta_deger, aralik = self._dal_sabitleri(dal)
+        if aralik == 0:
+            return None
+        if diklik == 0:
+            return (y - min_oran) / (max_oran - min_oran)
+
+        z = (y - orta_deger) / aralik
+        if not -1 < z < 1:
+            return None
+        return orta_nokta + math.atanh(z) / (2 * diklik)
+
+    def kirilma_noktalari(self):
+
+        noktalar = set()
+        for dal, a, b in self._dal_araliklari():
+            noktalar.update(p for p in (a, b) if 0 < p < 1)
+            for cap in (self.min_cap, self.max_cap):
+                x = self._dal_tersi(dal, cap)
+                if x is not None and a < x < b:
+                    noktalar.add(x)
+        return sorted(noktalar)
+
+    def parcalar(self):
+        """
+        [0, 1] aralığını kırılma noktalarından böler.
+        Her parça (baslangic, bitis, dal, kirpma) -> dal: 'short' / 'gecis' / 'long',
+        kirpma: None veya parçanın tamamen oturduğu cap ('min' / 'max').
+        """
+
+        sinirlar = [0.0] + self.kirilma_noktalari() + [1.0]
+        dal_araliklari = self._dal_araliklari()
+
+        parcalar = []
+        for a, b in zip(sinirlar, sinirlar[1:]):
+            orta = (a + b) / 2
+            dal = next(d for d, da, db in dal_araliklari if da <= orta <= db)
+            deger = self._dal_degeri(dal, orta)
+
+            if deger < self.min_cap:
+                kirpma = 'min'
+            elif deger > self.max_cap:
+                kirpma = 'max'
+            else:
+                kirpma = None
+            parcalar.append((a, b, dal, kirpma))
+
+        return parcalar
+
+    def kesilen_araliklar(self, kirpma):
+        """
+        'min' veya 'max' cap'in bağladığı pozisyon aralıklarını birleştirilmiş (baslangic, bitis) listesi olarak döndürür.
+        """
+
+        araliklar = []
+        for a, b, _, parca_kirpma in self.parcalar():
+            if parca_kirpma != kirpma:
+                continue
+            if araliklar and araliklar[-1][1] == a:
+                araliklar[-1] = (araliklar[-1][0], b)
+            else:
+                araliklar.append((a, b))
+        return araliklar
+
+    def _parca_sinir_degerleri(self, a, b, dal, kirpma):
+
+        if kirpma == 'min':
+            return self.min_cap, self.min_cap
+        if kirpma == 'max':
+            return self.max_cap, self.max_cap
+        return (min(max(self._dal_degeri(dal, a), self.min_cap), self.max_cap),
+                min(max(self._dal_degeri(dal, b), self.min_cap), self.max_cap))
+
+    def _parca_integralleri(self, a, b, dal, kirpma):
+
+        uzunluk = b - a
+        if kirpma is not None or dal == 'gecis' or self._dal_sabitleri(dal)[3] == 0:
+            # Sabit ve lineer parçalar için kapalı form
+            fa, fb = self._parca_sinir_degerleri(a, b, dal, kirpma)
+            return uzunluk * (fa + fb) / 2, uzunluk * (fa * fa + fa * fb + fb * fb) / 3
+
+        _, _, orta_nokta, diklik, orta_deger, aralik = self._dal_sabitleri(dal)
+        ua = 2 * diklik * (a - orta_nokta)
+        ub = 2 * diklik * (b - orta_nokta)
+
+        # ∫tanh(u) = log(cosh(u)), ∫tanh(u)^2 = u - tanh(u)
+        logcosh_farki = (_logcosh(ub) - _logcosh(ua)) / (2 * diklik)
+        tanh2_integrali = uzunluk - (math.tanh(ub) - math.tanh(ua)) / (2 * diklik)
+
+        birinci = orta_deger * uzunluk + aralik * logcosh_farki
+        ikinci = (orta_deger * orta_deger * uzunluk + 2 * orta_deger * aralik * logcosh_farki
+                  + aralik * aralik * tanh2_integrali)
+        return birinci, ikinci
+
+    def integral(self, baslangic=0.0, bitis=1.0):
+        """
+        [baslangic, bitis] ∩ [0, 1] üzerinde (∫f dx, ∫f² dx) değerlerini kapalı formda döndürür.
+        """
+
+        birinci = 0.0
+        ikinci = 0.0
+        for a, b, dal, kirpma in self.parcalar():
+            a, b = max(a, baslangic), min(b, bitis)
+            if b > a:
+                parca_birinci, parca_ikinci = self._parca_integralleri(a, b, dal, kirpma)
+                birinci += parca_birinci
+                ikinci += parca_ikinci
+        return birinci, ikinci
+
+    def istatistikler(self):
+
+        sinir_degerleri = [
+            deger for parca in self.parcalar() for deger in self._parca_sinir_degerleri(*parca)
+        ]
+        birinci, ikinci = self.integral(0.0, 1.0)
+
+        return {
+            'min': min(sinir_degerleri),
+            'max': max(sinir_degerleri),
+            'ortalama': birinci,
+            'standart_sapma': math.sqrt(max(ikinci - birinci * birinci, 0.0)),
+            'aralik': max(sinir_degerleri) - min(sinir_degerleri)
+        }
+
+    def ortalama(self, baslangic, bitis):
+
+        baslangic, bitis = max(baslangic, 0.0), min(bitis, 1.0)
+        if bitis <= baslangic:
+            return self.deger(baslangic)
+        return self.integral(baslangic, bitis)[0] / (bitis - baslangic)
+
+def _logcosh(u):
+
+    u = abs(u)
+    if u < 1e-4:
+        return u * u / 2 - u ** 4 / 12
+    return u + math.log1p(math.exp(-2 * u)) - math.log(2)
+
+class BolgeIndeksi:
+    """
+    funding_bolgeleri üzerinde sıralı sınırlarla bisect araması.
+    Bir nokta birden fazla bölgeye düşüyorsa listede önce gelen bölge seçilir.
+    """
+
+    def __init__(self, funding_bolgeleri, varsayilan_saat=8):
+
+        self.bolgeler = list(funding_bolgeleri)
+        self.varsayilan_saat = varsayilan_saat
+
+        sinirlar = set()
+        for bolge in self.bolgeler:
+            sinirlar.add(float(bolge['baslangic']))
+            sinirlar.add(float(bolge['bitis']))
+        self.sinirlar = sorted(sinirlar)
+
+        # nokta_bolgeleri[i] -> sinirlar[i] noktası, aralik_bolgeleri[i] -> (sinirlar[i-1], sinirlar[i]) aralığı
+        self.nokta_bolgeleri = [self._ilk_bolge(s) for s in self.sinirlar]
+        self.aralik_bolgeleri = [-1] + [
+            self._ilk_bolge((a + b) / 2) for a, b in zip(self.sinirlar, self.sinirlar[1:])
+        ] + [-1]
+
+        # Vektörel sınıflandırma dizileri; -1 bölge id'si son elemana, yani varsayılana düşer
+        self._sinir_dizisi = np.array(self.sinirlar, dtype=float)
+        self._nokta_sinirlari = np.append(self._sinir_dizisi, np.inf)
+        self._nokta_dizisi = np.array(self.nokta_bolgeleri + [-1], dtype=np.intp)
+        self._aralik_dizisi = np.array(self.aralik_bolgeleri, dtype=np.intp)
+        self._saat_dizisi = np.array([bolge['saat'] for bolge in self.bolgeler] + [varsayilan_saat])
+        self._etiket_dizisi = np.array([bolge.get('etiket') for bolge in self.bolgeler] + [None], dtype=object)
+
+    def _ilk_bolge(self, pozisyon):
+
+        for i, bolge in enumerate(self.bolgeler):
+            if bolge['baslangic'] <= pozisyon <= bolge['bitis']:
+                return i
+        return -1
+
+    def bul(self, pozisyon):
+
+        i = bisect_left(self.sinirlar, pozisyon)
+        if i < len(self.sinirlar) and self.sinirlar[i] == pozisyon:
+            return self.nokta_bolgeleri[i]
+        return self.aralik_bolgeleri[i]
+
+    def saat(self, pozisyon):
+
+        i = self.bul(pozisyon)
+        if i < 0:
+            return self.varsayilan_saat
+        return self.bolgeler[i]['saat']
+
+    def bolge_idleri(self, pozisyonlar):
+
+        x = np.asarray(pozisyonlar, dtype=float)
+        i = np.searchsorted(self._sinir_dizisi, x, side='left')
+        return np.where(self._nokta_sinirlari[i] == x, self._nokta_dizisi[i], self._aralik_dizisi[i])
+
+    def siniflandir(self, pozisyonlar):
+        """
+        Pozisyon dizisini tek seferde (saatler, bolge_idleri, etiketler) dizilerine çevirir.
+        Hiçbir bölgeye düşmeyen pozisyonlarda id -1, saat varsayilan_saat, etiket None olur.
+        """
+
+        bolge_idleri = self.bolge_idleri(pozisyonlar)
+        return self._saat_dizisi[bolge_idleri], bolge_idleri, self._etiket_dizisi[bolge_idleri]
+
+# |tanh(u) * sech(u)^2| bu noktada en büyük değerini alır
+_TANH_BUKUM_NOKTASI = math.atanh(1 / math.sqrt(3))
+
+def _tanh_egrilik_carpani(u):
+
+    t = math.tanh(u)
+    return abs(t) * (1 - t * t)
+
+class FundingTablosu:
+    """
+    Çift S-curve'ün bir parametre seti için bir kez tablolanmış hali.
+    Her parçada düğüm aralığı ikinci türev sınırından seçilir, böylece lineer
+    interpolasyon hatası max_hata'yı geçmez. Geçiş sınırları ve cap kesişimleri
+    düğümdür, kırılmalar tam olarak korunur.
+
+    Yalnızca toplu (hesapla) sorgu içindir: tek pozisyonda Python düzeyindeki indeksleme
+    tek bir math.tanh'tan hızlı değildir, skaler sorgular FundingCurve.deger ile yapılır.
+    """
+
+    def __init__(self, parametreler, max_hata=1e-6, max_dugum=5_000_000):
+
+        if max_hata <= 0:
+            raise ValueError("max_hata pozitif olmalı")
+
+        self.egri = FundingCurve(parametreler)
+        self.max_hata = max_hata
+
+        x_parcalari = []
+        y_parcalari = []
+        egim_parcalari = []
+        dugum_sayisi = 0
+
+        for a, b, dal, kirpma in self._alt_parcalar():
+            egrilik = 0.0 if kirpma else self._egrilik_siniri(dal, a, b)
+            if egrilik == 0:
+                n = 1
+            else:
+                n = max(1, math.ceil((b - a) / math.sqrt(8 * max_hata / egrilik)))
+
+            dugum_sayisi += n
+            if dugum_sayisi > max_dugum:
+                raise ValueError(f"Tablo {max_dugum} düğümü aşıyor, max_hata değerini büyütün")
+
+            xs = np.linspace(a, b, n + 1)
+            if kirpma == 'min':
+                ys = np.full(n + 1, self.egri.min_cap)
+            elif kirpma == 'max':
+                ys = np.full(n + 1, self.egri.max_cap)
+            else:
+                ys = np.clip(self.egri._dal_hesapla(dal, xs), self.egri.min_cap, self.egri.max_cap)
+
+            # Parçanın son düğümü bir sonraki parçanın ilk düğümüdür, aralıklar sol düğümle tutulur
+            x_parcalari.append(xs[:-1])
+            y_parcalari.append(ys[:-1])
+            egim_parcalari.append(np.diff(ys) / np.diff(xs))
+
+        self._x = np.concatenate(x_parcalari)
+        self._y = np.concatenate(y_parcalari)
+        self._egimler = np.concatenate(egim_parcalari)
+        self._sonraki_x = np.append(self._x[1:], np.inf)
+
+        # Sabit genişlikli hücre -> aralık eşlemesi, her hücreye en fazla bir düğüm düşer.
+        # Hücre sayısı sınırı aşılırsa ikili aramaya dönülür.
+        en_kisa_aralik = np.min(np.diff(np.append(self._x, 1.0)))
+        hucre_sayisi = math.ceil(1 / en_kisa_aralik)
+        if hucre_sayisi <= max_dugum:
+            self._hucre_sayisi = hucre_sayisi
+            hucre_baslangiclari = np.arange(hucre_sayisi + 1) / hucre_sayisi
+            self._hucre_araliklari = np.maximum(
+                np.searchsorted(self._x, hucre_baslangiclari, side='right') - 1, 0)
+        else:
+            self._hucre_sayisi = None
+
+    @property
+    def dugum_sayisi(self):
 
-    x = np.array([pozisyon])
-    funding, _, _ = cift_s_curve_sistemi_yeni(
-        x,
-        parametreler['short_min_oran'], parametreler['short_max_oran'], 
-        parametreler['short_orta_nokta'], parametreler['short_diklik'],
-        parametreler['long_min_oran'], parametreler['long_max_oran'], 
-        parametreler['long_orta_nokta'], parametreler['long_diklik'],
-        parametreler['gecis_genisligi'], parametreler['min_cap'], parametreler['max_cap']
+        return len(self._x) + 1
+
+    def _alt_parcalar(self):
+
+        for a, b, dal, kirpma in self.egri.parcalar():
+            kesimler = [a, b]
+
+            if kirpma is None and dal != 'gecis':
+                _, _, orta_nokta, diklik, _, _ = self.egri._dal_sabitleri(dal)
+                if diklik > 0:
+                    for u in (_TANH_BUKUM_NOKTASI, 1.5, 3.0, 6.0):
+                        for isaret in (-1, 1):
+                            p = orta_nokta + isaret * u / (2 * diklik)
+                            if a < p < b:
+                                kesimler.append(p)
+
+            kesimler.sort()
+            for c, d in zip(kesimler, kesimler[1:]):
+                yield c, d, dal, kirpma
+
+    def _egrilik_siniri(self, dal, a, b):
+
+        if dal == 'gecis':
+            return 0.0
+
+        _, _, orta_nokta, diklik, _, aralik = self.egri._dal_sabitleri(dal)
+        if diklik == 0:
+            return 0.0
+
+        u1 = 2 * diklik * (a - orta_nokta)
+        u2 = 2 * diklik * (b - orta_nokta)
+        if u1 <= _TANH_BUKUM_NOKTASI <= u2 or u1 <= -_TANH_BUKUM_NOKTASI <= u2:
+            carpan = _tanh_egrilik_carpani(_TANH_BUKUM_NOKTASI)
+        else:
+            carpan = max(_tanh_egrilik_carpani(u1), _tanh_egrilik_carpani(u2))
+
+        return abs(aralik) * 8 * diklik * diklik * carpan
+
+    def hesapla(self, x):
+
+        x = np.clip(np.asarray(x, dtype=float), 0.0, 1.0)
+
+        if self._hucre_sayisi is None:
+            i = np.maximum(np.searchsorted(self._x, x, side='right') - 1, 0)
+        else:
+            i = self._hucre_araliklari[(x * self._hucre_sayisi).astype(np.intp)]
+            i += x >= self._sonraki_x[i]
+
+        return self._y[i] + (x - self._x[i]) * self._egimler[i]
+
+def parametre_matrisi_olustur(parametre_listesi):
+
+    return np.array(
+        [[float(parametreler[anahtar]) for anahtar in EGRI_PARAMETRELERI] for parametreler in parametre_listesi],
+        dtype=float
+    ).reshape(-1, len(EGRI_PARAMETRELERI))
+
+def _toplu_s_curve_yaz(x, min_oran, max_oran, orta_nokta, diklik, out):
+
+    # _toplu_s_curve'ün yerinde hali; diklik = 0 satırları için yalnızca o durumda geçici dizi ayrılır
+    np.subtract(x, orta_nokta, out=out)
+    out *= 2 * diklik
+    np.tanh(out, out=out)
+    out *= (max_oran - min_oran) / 2
+    out += (min_oran + max_oran) / 2
+
+    if np.any(diklik == 0):
+        np.copyto(out, min_oran + (max_oran - min_oran) * x, where=diklik == 0)
+    return out
+
+def _toplu_s_curve(x, min_oran, max_oran, orta_nokta, diklik):
+
+    orta_deger = (min_oran + max_oran) / 2
+    aralik = (max_oran - min_oran) / 2
+    s_curve = orta_deger + aralik * np.tanh(diklik * (2 * (x - orta_nokta)))
+
+    if np.any(diklik == 0):
+        s_curve = np.where(diklik == 0, min_oran + (max_oran - min_oran) * x, s_curve)
+    return s_curve
+
+def coklu_market_funding_hesapla(parametre_matrisi, x, out=None, tampon=None):
+    """
+    parametre_matrisi: (N, 11) - satırlar market, kolonlar EGRI_PARAMETRELERI sırasında
+    x: (N,) her market için bir pozisyon ya da (N, M) her market için M pozisyon
+    out / tampon: sonuç dizisi ve EgriTamponu; tekrar eden çağrılarda yeniden kullanılır.
+    """
+
+    parametre_matrisi = np.asarray(parametre_matrisi, dtype=float)
+    x = np.asarray(x, dtype=float)
+
+    if parametre_matrisi.ndim != 2 or parametre_matrisi.shape[1] != len(EGRI_PARAMETRELERI):
+        raise ValueError(f"Parametre matrisi (N, {len(EGRI_PARAMETRELERI)}) boyutunda olmalı")
+    if x.ndim not in (1, 2) or x.shape[0] != parametre_matrisi.shape[0]:
+        raise ValueError("Pozisyon dizisi (N,) veya (N, M) boyutunda olmalı")
+
+    kolonlar = parametre_matrisi.T.reshape((len(EGRI_PARAMETRELERI), -1) + (1,) * (x.ndim - 1))
+    (short_min_oran, short_max_oran, short_orta_nokta, short_diklik,
+     long_min_oran, long_max_oran, long_orta_nokta, long_diklik,
+     gecis_genisligi, min_cap, max_cap) = kolonlar
+
+    gecis_baslangic = 0.5 - gecis_genisligi / 2
+    gecis_bitis = 0.5 + gecis_genisligi / 2
+
+    sonuc = _cikti_dizisi(out, x.shape, np.dtype(np.float64))
+    if tampon is None:
+        tampon = EgriTamponu(x.size)
+    ara, mask = tampon.al(x.shape)
+
+    # Parçalar tek maskeyle sırayla yazılır: short, x > baslangic'ta geçiş, x >= bitis'te long.
+    # Geçiş genişliği sıfır olan satırlarda geçiş adımının tamamını long ezer.
+    short_deger = _toplu_s_curve(gecis_baslangic, short_min_oran, short_max_oran, short_orta_nokta, short_diklik)
+    long_deger = _toplu_s_curve(gecis_bitis, long_min_oran, long_max_oran, long_orta_nokta, long_diklik)
+    gecis_egimi = (long_deger - short_deger) / np.where(gecis_genisligi > 0, gecis_genisligi, 1.0)
+
+    _toplu_s_curve_yaz(x, short_min_oran, short_max_oran, short_orta_nokta, short_diklik, sonuc)
+
+    np.subtract(x, gecis_baslangic, out=ara)
+    ara *= gecis_egimi
+    ara += short_deger
+    np.greater(x, gecis_baslangic, out=mask)
+    np.copyto(sonuc, ara, where=mask)
+
+    _toplu_s_curve_yaz(x, long_min_oran, long_max_oran, long_orta_nokta, long_diklik, ara)
+    np.greater_equal(x, gecis_bitis, out=mask)
+    np.copyto(sonuc, ara, where=mask)
+
+    return np.clip(sonuc, min_cap, max_cap, out=sonuc)
+
+def senaryolari_karsilastir(senaryolar, x_degerleri, referans=None):
+    """
+    senaryolar: {isim: parametreler} veya settings.json 'senaryolar' biçimi ({isim: {'parametreler': ...}}).
+    Geçerli tüm senaryolar tek bir (N, M) yayınlama geçişinde ortak ızgarada hesaplanır.
+    Özet farkları referans senaryoya (varsayılan: ilk geçerli senaryo) göredir.
+    """
+
+    x_degerleri = np.asarray(x_degerleri, dtype=float)
+
+    isimler = []
+    parametre_listesi = []
+    atlananlar = {}
+    for isim, senaryo in senaryolar.items():
+        parametreler = senaryo.get('parametreler', senaryo)
+        eksikler = [anahtar for anahtar in EGRI_PARAMETRELERI if anahtar not in parametreler]
+        hatalar = [f"Eksik parametre: {', '.join(eksikler)}"] if eksikler else parametreleri_dogrula_yeni(parametreler)
+        if hatalar:
+            atlananlar[isim] = hatalar
+            continue
+        isimler.append(isim)
+        parametre_listesi.append(parametreler)
+
+    if not isimler:
+        return {'x_degerleri': x_degerleri, 'isimler': [], 'egriler': {}, 'ozet': [],
+                'referans': None, 'atlananlar': atlananlar}
+
+    parametre_matrisi = parametre_matrisi_olustur(parametre_listesi)
+    n = len(isimler)
+
+    # Izgara ve nötr nokta aynı geçişte: son kolon x = 0.5
+    x_matrisi = np.broadcast_to(np.append(x_degerleri, 0.5), (n, len(x_degerleri) + 1))
+    sonuc = coklu_market_funding_hesapla(parametre_matrisi, x_matrisi)
+    egriler, notr_funding = sonuc[:, :-1], sonuc[:, -1]
+
+    if referans not in isimler:
+        referans = isimler[0]
+    referans_egrisi = egriler[isimler.index(referans)]
+    farklar = egriler - referans_egrisi
+
+    ortalamalar = _trapez(egriler, x_degerleri, axis=1) if len(x_degerleri) > 1 else egriler.mean(axis=1)
+    minimumlar = egriler.min(axis=1)
+    maksimumlar = egriler.max(axis=1)
+    max_farklar = np.abs(farklar).max(axis=1)
+    kare_farklar = farklar * farklar
+    # Izgara düzgün olmayabilir (uyarlamali_ornekleme); ortalamalar x'e göre ağırlıklı
+    rms_farklar = np.sqrt(
+        _trapez(kare_farklar, x_degerleri, axis=1) if len(x_degerleri) > 1 else kare_farklar.mean(axis=1)
     )
-    
-    
-    funding_bolgeleri = parametreler.get('funding_bolgeleri', [])
-    saat_dilimi = 8  
-    
-    for bolge in funding_bolgeleri:
-        if bolge['baslangic'] <= pozisyon <= bolge['bitis']:
-            saat_dilimi = bolge['saat']
-            break
-    
-    return funding[0], saat_dilimi
+
+    referans_indeksi = isimler.index(referans)
+    ozet = [
+        {
+            'senaryo': isim,
+            'min': float(minimumlar[i]),
+            'max': float(maksimumlar[i]),
+            'ortalama': float(ortalamalar[i]),
+            'notr_funding': float(notr_funding[i]),
+            'ortalama_farki': float(ortalamalar[i] - ortalamalar[referans_indeksi]),
+            'notr_farki': float(notr_funding[i] - notr_funding[referans_indeksi]),
+            'max_fark': float(max_farklar[i]),
+            'rms_fark': float(rms_farklar[i])
+        }
+        for i, isim in enumerate(isimler)
+    ]
+
+    return {
+        'x_degerleri': x_degerleri,
+        'isimler': isimler,
+        'egriler': dict(zip(isimler, egriler)),
+        'ozet': ozet,
+        'referans': referans,
+        'atlananlar': atlananlar
+    }
+
+class EgriOnbellegi:
+    """
+    cift_s_curve_sistemi_yeni sonuçları için süreç içi LRU önbellek.
+    Anahtar, eğri parametrelerinin ve x ızgarasının içerik özetidir; aynı eğri
+    hangi çağıran tarafından istenirse istensin bir kez hesaplanır.
+    """
+
+    def __init__(self, max_boyut=64):
+
+        self.max_boyut = max_boyut
+        self.isabet = 0
+        self.iska = 0
+        self._kayitlar = OrderedDict()
+        self._kilit = threading.Lock()
+
+    @staticmethod
+    def anahtar(x, parametreler):
+
+        x = np.ascontiguousarray(x)
+        # + 0.0 ile -0.0 ve 0.0 aynı anahtarı üretir
+        degerler = np.array([float(parametreler[anahtar]) for anahtar in EGRI_PARAMETRELERI]) + 0.0
+
+        ozet = hashlib.blake2b(digest_size=16)
+        ozet.update(degerler.tobytes())
+        ozet.update(f"{x.dtype.str}{x.shape}".encode())
+        ozet.update(memoryview(x).cast('B'))
+        return ozet.hexdigest()
+
+    def egrileri_al(self, x, parametreler):
+
+        anahtar = self.anahtar(x, parametreler)
+
+        with self._kilit:
+            if anahtar in self._kayitlar:
+                self._kayitlar.move_to_end(anahtar)
+                self.isabet += 1
+                return self._kayitlar[anahtar]
+
+        egriler = cift_s_curve_sistemi_yeni(
+            x, *(parametreler[anahtar_ismi] for anahtar_ismi in EGRI_PARAMETRELERI)
+        )
+        # Paylaşılan sonuçlar çağıranlar tarafından değiştirilemez
+        for egri in egriler:
+            egri.flags.writeable = False
+
+        with self._kilit:
+            self.iska += 1
+            self._kayitlar[anahtar] = egriler
+            self._kayitlar.move_to_end(anahtar)
+            while len(self._kayitlar) > self.max_boyut:
+                self._kayitlar.popitem(last=False)
+
+        return egriler
+
+    def istatistikler(self):
+
+        with self._kilit:
+            toplam = self.isabet + self.iska
+            return {
+                'isabet': self.isabet,
+                'iska': self.iska,
+                'isabet_orani': self.isabet / toplam if toplam else 0.0,
+                'boyut': len(self._kayitlar),
+                'max_boyut': self.max_boyut
+            }
+
+    def temizle(self):
+
+        with self._kilit:
+            self._kayitlar.clear()
+            self.isabet = 0
+            self.iska = 0
+
+EGRI_ONBELLEGI = EgriOnbellegi()
+
+def onbellekli_cift_s_curve(x, parametreler):
+
+    return EGRI_ONBELLEGI.egrileri_al(x, parametreler)
+
+@lru_cache(maxsize=128)
+def _derlenmis_funding_curve(egri_anahtari, bolge_anahtari):
+
+    parametreler = dict(zip(EGRI_PARAMETRELERI, egri_anahtari))
+    parametreler['funding_bolgeleri'] = [
+        {'baslangic': baslangic, 'bitis': bitis, 'saat': saat}
+        for baslangic, bitis, saat in bolge_anahtari
+    ]
+    return FundingCurve(parametreler)
+
+def _derlenmis_egriyi_al(parametreler):
+
+    egri_anahtari = tuple(parametreler[anahtar] for anahtar in EGRI_PARAMETRELERI)
+    bolge_anahtari = tuple(
+        (bolge['baslangic'], bolge['bitis'], bolge['saat'])
+        for bolge in parametreler.get('funding_bolgeleri', [])
+    )
+    return _derlenmis_funding_curve(egri_anahtari, bolge_anahtari)
+
+def belirli_pozisyondaki_funding_hesapla(pozisyon, parametreler):
+
+    return _derlenmis_egriyi_al(parametreler).funding_ve_saat(pozisyon)
+
+def belirli_pozisyondaki_bolge_hesapla(pozisyon, parametreler):
+    """
+    (funding, saat, bolge_id); bolge_id funding_bolgeleri listesindeki sıradır, bölge dışında -1.
+    """
+
+    return _derlenmis_egriyi_al(parametreler).funding_saat_ve_bolge(pozisyon)
 
 def funding_oran_hesaplamalari(funding_orani_per_period, saat_dilimi):
 
@@ -179,6 +990,139 @@ def sistem_istatistiklerini_hesapla_yeni(funding_oranlari):
     
     return istatistikler
 
+def kesin_istatistikleri_hesapla(parametreler):
+    """
+    Eğrinin [0, 1] pozisyon ekseni üzerindeki min, max, ortalama ve standart sapmasını
+    örneklemeden, kapalı form integrallerle hesaplar. Bölge ortalamaları da eklenir.
+    """
+
+    egri = FundingCurve(parametreler)
+    istatistikler = egri.istatistikler()
+    
+    istatistikler['bolge_ortalamalari'] = [
+        {'bolge': bolge, 'ortalama': egri.ortalama(bolge['baslangic'], bolge['bitis'])}
+        for bolge in parametreler.get('funding_bolgeleri', [])
+    ]
+    
+    return istatistikler
+
+def uyarlamali_ornekleme(parametreler, nokta_butcesi=None, taban_orani=0.25):
+    """
+    [0, 1] üzerinde nokta_butcesi kadar (varsayılan: cozunurluk) pozisyon üretir.
+    Nokta yoğunluğu sqrt(|f''|) ile orantılıdır, böylece lineer çizimin hatası her aralıkta
+    yaklaşık eşit olur. taban_orani yoğunluğun bir kısmını düzgün dağıtır, düz parçalar boş kalmaz.
+    Kırılma noktaları (geçiş sınırları, cap kesişimleri), orta noktalar ve 0, 1 her zaman eklenir.
+    """
+
+    if nokta_butcesi is None:
+        nokta_butcesi = parametreler.get('cozunurluk', 500)
+    nokta_butcesi = max(int(nokta_butcesi), 2)
+
+    egri = FundingCurve(parametreler)
+
+    zorunlu = [0.0, 1.0] + egri.kirilma_noktalari()
+    zorunlu += [p for p in (egri.short_orta_nokta, egri.long_orta_nokta) if 0 < p < 1]
+    if egri.gecis_genisligi == 0:
+        # Sıfır genişlikte eğri 0.5'te sıçrar; sıçramanın iki yanı da çizilsin
+        zorunlu.append(np.nextafter(egri.gecis_baslangic, 0.0))
+    zorunlu = np.unique(np.clip(zorunlu, 0.0, 1.0))
+
+    ince = np.linspace(0.0, 1.0, min(max(20 * nokta_butcesi, 2000), 200_000))
+    egrilik = np.zeros_like(ince)
+
+    for a, b, dal, kirpma in egri.parcalar():
+        if kirpma is not None or dal == 'gecis':
+            continue
+        _, _, orta_nokta, diklik, _, aralik = egri._dal_sabitleri(dal)
+        if diklik == 0:
+            continue
+        secim = (ince >= a) & (ince <= b)
+        t = np.tanh(2 * diklik * (ince[secim] - orta_nokta))
+        # f'' = -2 * aralik * (2k)^2 * t * (1 - t^2)
+        egrilik[secim] = np.abs(2 * aralik * (2 * diklik) ** 2 * t * (1 - t * t))
+
+    yogunluk = np.sqrt(egrilik)
+    ortalama_yogunluk = yogunluk.mean()
+    if ortalama_yogunluk == 0:
+        yogunluk[:] = 1.0
+    else:
+        yogunluk += taban_orani / (1 - taban_orani) * ortalama_yogunluk
+
+    kumulatif = np.concatenate([[0.0], np.cumsum((yogunluk[1:] + yogunluk[:-1]) / 2 * np.diff(ince))])
+    # Seviyelerin uçları 0 ve 1'e düşer, zorunlu noktalarla çakışır
+    serbest_nokta = max(nokta_butcesi - len(zorunlu) + 2, 2)
+    seviyeler = np.linspace(0.0, kumulatif[-1], serbest_nokta)
+
+    return np.union1d(np.interp(seviyeler, kumulatif, ince), zorunlu)
+
+def ters_funding_hesapla(hedef_oranlar, parametreler):
+    """
+    Hedef funding oranına (%) ulaşılan en küçük pozisyonu döndürür, ulaşılamıyorsa NaN.
+    Tanh dallarında atanh, geçişte lineer çözüm kullanılır. Cap'te kesilen düz parçalarda
+    hedef cap değerine eşitse parçanın başlangıcı döner.
+    """
+
+    egri = FundingCurve(parametreler)
+    hedefler = np.asarray(hedef_oranlar, dtype=float)
+    sonuc = np.full(hedefler.shape, np.nan)
+
+    for a, b, dal, kirpma in egri.parcalar():
+        fa, fb = egri._parca_sinir_degerleri(a, b, dal, kirpma)
+        alt, ust = min(fa, fb), max(fa, fb)
+        bos = np.isnan(sonuc)
+
+        if kirpma is not None or alt == ust:
+            # Düz parça: yalnızca tam eşitlikte, plato başlangıcı
+            sonuc[bos & (hedefler == fa)] = a
+            continue
+
+        secili = bos & (hedefler >= alt) & (hedefler <= ust)
+        if not secili.any():
+            continue
+
+        y = hedefler[secili]
+        if dal == 'gecis':
+            x = egri.gecis_baslangic + (y - egri.short_gecis_degeri) / egri.gecis_farki * egri.gecis_genisligi
+        else:
+            min_oran, max_oran, orta_nokta, diklik, orta_deger, aralik = egri._dal_sabitleri(dal)
+            if diklik == 0:
+                x = (y - min_oran) / (max_oran - min_oran)
+            else:
+                with np.errstate(divide='ignore'):
+                    x = orta_nokta + np.arctanh(np.clip((y - orta_deger) / aralik, -1.0, 1.0)) / (2 * diklik)
+
+        sonuc[secili] = np.clip(x, a, b)
+
+    return sonuc
+
+def kritik_seviyeleri_hesapla(parametreler):
+    """
+    Cap'lerin devreye girip çıktığı pozisyonlar ve sıfır funding noktası: {pozisyon: etiket}.
+    """
+
+    egri = FundingCurve(parametreler)
+    kritik_seviyeler = {}
+
+    def ekle(pozisyon, etiket):
+        pozisyon = float(pozisyon)
+        if pozisyon in kritik_seviyeler:
+            kritik_seviyeler[pozisyon] += f" / {etiket}"
+        else:
+            kritik_seviyeler[pozisyon] = etiket
+
+    for kirpma, ad in (('min', 'Min Cap'), ('max', 'Max Cap')):
+        for a, b in egri.kesilen_araliklar(kirpma):
+            if a > 0:
+                ekle(a, f"{ad} başlangıcı")
+            if b < 1:
+                ekle(b, f"{ad} bitişi")
+
+    sifir = ters_funding_hesapla(0.0, parametreler)
+    if not np.isnan(sifir):
+        ekle(sifir, "Sıfır Funding")
+
+    return dict(sorted(kritik_seviyeler.items()))
+
 def gecis_bolgesi_bilgilerini_hesapla(parametreler):
 
     gecis_merkez = 0.5
@@ -235,28 +1179,48 @@ def parametreleri_dogrula_yeni(parametreler):
     
     return hatalar
 
-def duyarlilik_analizi_uret_yeni(temel_parametreler, parametre_ismi, varyasyon_araligi, x_degerleri):
+def parametre_izgarasi_tara(temel_parametreler, taramalar, x_degerleri, parca_boyutu=None):
+    """
+    taramalar: {parametre_ismi: degerler} - her parametre ızgarada bir eksen olur.
+    Dönüş: (len(degerler_1), ..., len(degerler_k), len(x_degerleri)) boyutunda funding matrisi.
+    """
 
-    sonuclar = {}
-    
-    for varyasyon in varyasyon_araligi:
-        
-        test_parametreleri = temel_parametreler.copy()
-        test_parametreleri[parametre_ismi] = varyasyon
-        
-        
-        funding_degerleri, _, _ = cift_s_curve_sistemi_yeni(
-            x_degerleri, 
-            test_parametreleri['short_min_oran'], test_parametreleri['short_max_oran'],
-            test_parametreleri['short_orta_nokta'], test_parametreleri['short_diklik'],
-            test_parametreleri['long_min_oran'], test_parametreleri['long_max_oran'],
-            test_parametreleri['long_orta_nokta'], test_parametreleri['long_diklik'],
-            test_parametreleri['gecis_genisligi'], test_parametreleri['min_cap'], test_parametreleri['max_cap']
+    for parametre_ismi in taramalar:
+        if parametre_ismi not in EGRI_PARAMETRELERI:
+            raise ValueError(f"Bilinmeyen eğri parametresi: {parametre_ismi}")
+
+    eksenler = [np.asarray(degerler, dtype=float).ravel() for degerler in taramalar.values()]
+    izgara_sekli = tuple(len(eksen) for eksen in eksenler)
+    x_degerleri = np.asarray(x_degerleri, dtype=float).ravel()
+
+    parametre_matrisi = np.empty(izgara_sekli + (len(EGRI_PARAMETRELERI),))
+    parametre_matrisi[...] = parametre_matrisi_olustur([temel_parametreler])[0]
+    for parametre_ismi, izgara in zip(taramalar, np.meshgrid(*eksenler, indexing='ij')):
+        parametre_matrisi[..., EGRI_PARAMETRELERI.index(parametre_ismi)] = izgara
+    parametre_matrisi = parametre_matrisi.reshape(-1, len(EGRI_PARAMETRELERI))
+
+    # Ara diziler önbellekte kalsın diye satırlar parça parça değerlendirilir
+    if parca_boyutu is None:
+        parca_boyutu = max(1, (1 << 15) // max(len(x_degerleri), 1))
+
+    sonuc = np.empty((parametre_matrisi.shape[0], len(x_degerleri)))
+    tampon = EgriTamponu(min(parca_boyutu, parametre_matrisi.shape[0]) * len(x_degerleri))
+    for bas in range(0, parametre_matrisi.shape[0], parca_boyutu):
+        parca = parametre_matrisi[bas:bas + parca_boyutu]
+        coklu_market_funding_hesapla(
+            parca, np.broadcast_to(x_degerleri, (len(parca), len(x_degerleri))),
+            out=sonuc[bas:bas + len(parca)], tampon=tampon
         )
-        
-        sonuclar[varyasyon] = funding_degerleri
+
+    return sonuc.reshape(izgara_sekli + (len(x_degerleri),))
+
+def duyarlilik_analizi_uret_yeni(temel_parametreler, parametre_ismi, varyasyon_araligi, x_degerleri):
+
+    funding_matrisi = parametre_izgarasi_tara(
+        temel_parametreler, {parametre_ismi: varyasyon_araligi}, x_degerleri
+    )
     
-    return sonuclar
+    return {varyasyon: funding_matrisi[i] for i, varyasyon in enumerate(varyasyon_araligi)}
 
 def test_senaryolari_uret_yeni(x_degerleri):
 
@@ -272,28 +1236,24 @@ def test_senaryolari_uret_yeni(x_degerleri):
 def cap_etkisi_analizi(x_degerleri, parametreler, orijinal_min_cap, orijinal_max_cap):
 
     orijinal_params = parametreler.copy()
-    orijinal_params['min_cap'] = -10.0  
-    orijinal_params['max_cap'] = 10.0
-    
-    orijinal_curve, _, _ = cift_s_curve_sistemi_yeni(
-        x_degerleri,
-        orijinal_params['short_min_oran'], orijinal_params['short_max_oran'],
-        orijinal_params['short_orta_nokta'], orijinal_params['short_diklik'],
-        orijinal_params['long_min_oran'], orijinal_params['long_max_oran'],
-        orijinal_params['long_orta_nokta'], orijinal_params['long_diklik'],
-        orijinal_params['gecis_genisligi'], orijinal_params['min_cap'], orijinal_params['max_cap']
-    )
+    orijinal_params['min_cap'] = -np.inf
+    orijinal_params['max_cap'] = np.inf
     
+    orijinal_curve, _, _ = onbellekli_cift_s_curve(x_degerleri, orijinal_params)
     
-    capli_curve, _, _ = cift_s_curve_sistemi_yeni(
-        x_degerleri,
-        parametreler['short_min_oran'], parametreler['short_max_oran'],
-        parametreler['short_orta_nokta'], parametreler['short_diklik'],
-        parametreler['long_min_oran'], parametreler['long_max_oran'],
-        parametreler['long_orta_nokta'], parametreler['long_diklik'],
-        parametreler['gecis_genisligi'], orijinal_min_cap, orijinal_max_cap
-    )
+    # Cap yalnızca son adımda kırpma olduğu için cap'li eğri cap'sizden türetilir
+    capli_curve = np.clip(orijinal_curve, orijinal_min_cap, orijinal_max_cap)
+    
+    capli_params = parametreler.copy()
+    capli_params['min_cap'] = orijinal_min_cap
+    capli_params['max_cap'] = orijinal_max_cap
+    
+    egri = FundingCurve(capli_params)
+    min_kesilen_araliklar = egri.kesilen_araliklar('min')
+    max_kesilen_araliklar = egri.kesilen_araliklar('max')
     
+    min_kesilen_oran = sum(b - a for a, b in min_kesilen_araliklar)
+    max_kesilen_oran = sum(b - a for a, b in max_kesilen_araliklar)
     
     min_kesilen = np.sum(orijinal_curve < orijinal_min_cap)
     max_kesilen = np.sum(orijinal_curve > orijinal_max_cap)
@@ -301,6 +1261,11 @@ def cap_etkisi_analizi(x_degerleri, parametreler, orijinal_min_cap, orijinal_max
     return {
         'orijinal_curve': orijinal_curve,
         'capli_curve': capli_curve,
+        'min_kesilen_araliklar': min_kesilen_araliklar,
+        'max_kesilen_araliklar': max_kesilen_araliklar,
+        'min_kesilen_oran': min_kesilen_oran,
+        'max_kesilen_oran': max_kesilen_oran,
+        'kesinti_orani': min_kesilen_oran + max_kesilen_oran,
         'min_kesilen_nokta': min_kesilen,
         'max_kesilen_nokta': max_kesilen,
         'toplam_kesilen': min_kesilen + max_kesilen,
@@ -309,20 +1274,24 @@ def cap_etkisi_analizi(x_degerleri, parametreler, orijinal_min_cap, orijinal_max
 
 def funding_bolgeleri_analizi(funding_bolgeleri, parametreler):
 
+    if not funding_bolgeleri:
+        return []
+    
+    egri = FundingCurve(parametreler)
+    orta_pozisyonlar = np.array([(bolge['baslangic'] + bolge['bitis']) / 2 for bolge in funding_bolgeleri])
+    funding_oranlari = egri.hesapla(orta_pozisyonlar)
+    
     analizler = []
     
-    for bolge in funding_bolgeleri:
-        
-        orta_pozisyon = (bolge['baslangic'] + bolge['bitis']) / 2
-        funding_orani, _ = belirli_pozisyondaki_funding_hesapla(orta_pozisyon, parametreler)
-        
+    for bolge, orta_pozisyon, funding_orani in zip(funding_bolgeleri, orta_pozisyonlar, funding_oranlari):
         
         hesaplamalar = funding_oran_hesaplamalari_dinamik(funding_orani, bolge['saat'], orta_pozisyon)
         
         analizler.append({
             'bolge': bolge,
             'funding_orani': funding_orani,
+            'ortalama_funding_orani': egri.ortalama(bolge['baslangic'], bolge['bitis']),
             'hesaplamalar': hesaplamalar
         })
     
-    return analizler
\ No newline at end of file
+    return analizler
@@ -10,26 +10,17 @@ from datetime import datetime
 
 from config import HAZIR_MODLAR, VARSAYILAN_PARAMETRELER, ARAYUZ_AYARLARI, METINLER
 from curve_functions import (
-    cift_s_curve_sistemi_yeni, 
-    sistem_istatistiklerini_hesapla_yeni,
     parametreleri_dogrula_yeni,
-    gecis_bolgesi_bilgilerini_hesapla,
-    duyarlilik_analizi_uret_yeni,
-    cap_etkisi_analizi,
     belirli_pozisyondaki_funding_hesapla,
     funding_oran_hesaplamalari,
-    funding_oran_hesaplamalari_dinamik,
-    funding_bolgeleri_analizi
+    funding_oran_hesaplamalari_dinamik
 )
 from visualization import (
-    ana_grafigi_olustur_yeni,
     pozisyon_slider_widget,
-    parametre_duyarlilik_grafigi_yeni,
-    cap_etkisi_grafigi,
     istatistik_tablosu_olustur,
-    funding_hesaplama_tablosu,
-    gecis_bolgesi_detay_grafigi_yeni
+    funding_hesaplama_tablosu
 )
+import app_cache
 from utils import (
     hazir_mod_yukle,
     kayitli_ayarlari_yukle,
@@ -350,6 +341,14 @@ def sidebar_olustur():
         key='gecis_genisligi'
     )
     
+    cozunurluk = st.sidebar.number_input(
+        "Çözünürlük",
+        **ARAYUZ_AYARLARI['number_input_ayarlari']['cozunurluk'],
+        value=int(st.session_state.parametreler.get('cozunurluk', 500)),
+        key='cozunurluk',
+        help="Grafik nokta sayısı; noktalar eğriliğe göre yerleştirilir"
+    )
+    
     col1, col2 = st.sidebar.columns(2)
     with col1:
         min_cap = st.number_input(
@@ -460,52 +459,42 @@ def sidebar_olustur():
         'gecis_genisligi': gecis_genisligi,
         'min_cap': min_cap,
         'max_cap': max_cap,
-        'funding_bolgeleri': funding_bolgeleri,
-        'kritik_seviyeler': {}
+        'cozunurluk': int(cozunurluk),
+        'funding_bolgeleri': funding_bolgeleri
     }
+    mevcut_parametreler['kritik_seviyeler'] = app_cache.kritik_seviyeler(
+        app_cache.parametre_goruntusu(mevcut_parametreler)
+    )
     
     return mevcut_parametreler
 
 def ana_icerik_olustur(parametreler):
 
-    x_degerleri = np.linspace(0, 1, 500)
+    goruntu = app_cache.parametre_goruntusu(parametreler)
     
     
-    combined_curve, short_curve, long_curve = cift_s_curve_sistemi_yeni(
-        x_degerleri,
-        parametreler['short_min_oran'], parametreler['short_max_oran'],
-        parametreler['short_orta_nokta'], parametreler['short_diklik'],
-        parametreler['long_min_oran'], parametreler['long_max_oran'],
-        parametreler['long_orta_nokta'], parametreler['long_diklik'],
-        parametreler['gecis_genisligi'], parametreler['min_cap'], parametreler['max_cap']
+    x_degerleri, combined_curve, short_curve, long_curve = app_cache.egri_verileri(
+        goruntu, parametreler.get('cozunurluk', 500)
     )
     
     
-    gecis_bilgileri = gecis_bolgesi_bilgilerini_hesapla(parametreler)
+    gecis_bilgileri = app_cache.gecis_bilgileri(goruntu)
     
     
     st.subheader("Dinamik Funding Fee Sistemi")
     
     
-    ana_fig = ana_grafigi_olustur_yeni(
-        x_degerleri, 
-        combined_curve,
-        parametreler.get('funding_bolgeleri'),  
-        gecis_bilgileri['baslangic'], 
-        gecis_bilgileri['bitis'],
-        parametreler['min_cap'], 
-        parametreler['max_cap']
-    )
+    ana_fig = app_cache.ana_grafik(goruntu, parametreler.get('cozunurluk', 500))
     
     st.plotly_chart(ana_fig, use_container_width=True)
     
     
-    pozisyon, funding_orani, saat_dilimi = pozisyon_slider_widget(x_degerleri, combined_curve, parametreler)
+    pozisyon_slider_widget(x_degerleri, combined_curve, parametreler)
     
     st.markdown("---")
     
     
-    istatistikler = sistem_istatistiklerini_hesapla_yeni(combined_curve)
+    istatistikler = app_cache.istatistikler(goruntu)
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -524,7 +513,7 @@ def ana_icerik_olustur(parametreler):
     
     st.subheader("⏱️ Dinamik Funding Bölgeleri Analizi")
     
-    bolge_analizleri = funding_bolgeleri_analizi(parametreler.get('funding_bolgeleri', []), parametreler)
+    bolge_analizleri = app_cache.bolge_analizleri(goruntu)
     
     if bolge_analizleri:
         bolge_df_data = []
@@ -538,6 +527,7 @@ def ana_icerik_olustur(parametreler):
                 "⏱️ Funding Sıklığı": f"{bolge['saat']} saat",
                 "Günlük Kesim": f"{hesaplamalar['gunluk_kesim_sayisi']:.1f}x",
                 "Orta Nokta Funding": f"{analiz['funding_orani']:.6f}%",
+                "Bölge Ortalaması": f"{analiz['ortalama_funding_orani']:.6f}%",
                 "Günlük Toplam": f"{hesaplamalar['gunluk_oran']:.6f}%",
                 "📈 Yıllık Toplam": f"{hesaplamalar['yillik_oran']:.3f}%"
             })
@@ -546,16 +536,68 @@ def ana_icerik_olustur(parametreler):
         st.dataframe(bolge_df, use_container_width=True, hide_index=True)
     
     
-    tab1, tab2 = st.tabs([
-        "Sistem Detayları", 
-        "Geçiş Bölgesi"
-    ])
+    # Yalnızca seçilen panel hesaplanır; sonuçlar parametre görüntüsüne bağlı önbellekte kalır
+    paneller = {
+        "Sistem Detayları": lambda: sistem_detaylarini_goster_yeni(x_degerleri, combined_curve, parametreler, istatistikler),
+        "Geçiş Bölgesi": lambda: gecis_bolgesi_analizini_goster_yeni(x_degerleri, combined_curve, gecis_bilgileri, parametreler),
+        "Senaryo Karşılaştırma": lambda: senaryo_karsilastirmasini_goster(x_degerleri, parametreler),
+        "Cap Etkisi": lambda: cap_analizini_goster(x_degerleri, parametreler),
+        "Parametre Duyarlılığı": lambda: parametre_analizini_goster_yeni(x_degerleri, parametreler)
+    }
     
-    with tab1:
-        sistem_detaylarini_goster_yeni(x_degerleri, combined_curve, parametreler, istatistikler)
+    secilen_panel = st.radio(
+        "Analiz Paneli",
+        list(paneller),
+        horizontal=True,
+        key="analiz_paneli",
+        label_visibility="collapsed"
+    )
     
-    with tab2:
-        gecis_bolgesi_analizini_goster_yeni(x_degerleri, combined_curve, gecis_bilgileri, parametreler)
+    paneller[secilen_panel]()
+
+def senaryo_karsilastirmasini_goster(x_degerleri, parametreler):
+    
+    goruntu = app_cache.parametre_goruntusu(parametreler)
+    senaryolar_goruntusu = app_cache.senaryo_goruntusu(st.session_state.get('yuklu_senaryolar', {}))
+    
+    karsilastirma = app_cache.senaryo_karsilastirmasi(goruntu, senaryolar_goruntusu, parametreler.get('cozunurluk', 500))
+    
+    if karsilastirma['atlananlar']:
+        st.warning(f"⚠️ Geçersiz {len(karsilastirma['atlananlar'])} senaryo atlandı: {', '.join(karsilastirma['atlananlar'])}")
+    
+    if len(karsilastirma['isimler']) < 2:
+        st.info("Karşılaştırma için settings.json'da kayıtlı senaryo bulunamadı")
+        return
+    
+    secilenler = st.multiselect(
+        "Grafikte gösterilecek senaryolar",
+        karsilastirma['isimler'],
+        default=karsilastirma['isimler'][:5],
+        key="karsilastirma_secimi"
+    )
+    
+    if secilenler:
+        karsilastirma_fig = app_cache.karsilastirma_grafigi(
+            goruntu, senaryolar_goruntusu, tuple(secilenler), parametreler.get('cozunurluk', 500)
+        )
+        st.plotly_chart(karsilastirma_fig, use_container_width=True)
+    
+    st.caption(f"Farklar referans alınan '{karsilastirma['referans']}' eğrisine göredir")
+    ozet_df = pd.DataFrame([
+        {
+            "Senaryo": ozet['senaryo'],
+            "Min": f"{ozet['min']:.6f}%",
+            "Max": f"{ozet['max']:.6f}%",
+            "Ortalama": f"{ozet['ortalama']:.6f}%",
+            "Nötr Funding": f"{ozet['notr_funding']:.6f}%",
+            "Ortalama Farkı": f"{ozet['ortalama_farki']:+.6f}%",
+            "Nötr Farkı": f"{ozet['notr_farki']:+.6f}%",
+            "Max Fark": f"{ozet['max_fark']:.6f}%",
+            "RMS Fark": f"{ozet['rms_fark']:.6f}%"
+        }
+        for ozet in karsilastirma['ozet']
+    ])
+    st.dataframe(ozet_df, use_container_width=True, hide_index=True)
 
 def sistem_detaylarini_goster_yeni(x_degerleri, combined_curve, parametreler, istatistikler):
 
@@ -642,21 +684,18 @@ def parametre_analizini_goster_yeni(x_degerleri, parametreler):
     varyasyon_araligi = np.linspace(varyasyon_min, varyasyon_max, varyasyon_adim)
     
     
-    duyarlilik_verileri = duyarlilik_analizi_uret_yeni(parametreler, secilen_parametre, varyasyon_araligi, x_degerleri)
+    goruntu = app_cache.parametre_goruntusu(parametreler)
+    varyasyon_degerleri = tuple(float(deger) for deger in varyasyon_araligi)
     
     
-    temel_curve, _, _ = cift_s_curve_sistemi_yeni(
-        x_degerleri,
-        parametreler['short_min_oran'], parametreler['short_max_oran'],
-        parametreler['short_orta_nokta'], parametreler['short_diklik'],
-        parametreler['long_min_oran'], parametreler['long_max_oran'],
-        parametreler['long_orta_nokta'], parametreler['long_diklik'],
-        parametreler['gecis_genisligi'], parametreler['min_cap'], parametreler['max_cap']
+    duyarlilik_verileri = app_cache.duyarlilik_analizi(
+        goruntu, secilen_parametre, varyasyon_degerleri, parametreler.get('cozunurluk', 500)
     )
     
     
-    duyarlilik_fig = parametre_duyarlilik_grafigi_yeni(
-        x_degerleri, temel_curve, duyarlilik_verileri, parametre_secenekleri[secilen_parametre]
+    duyarlilik_fig = app_cache.duyarlilik_grafigi(
+        goruntu, secilen_parametre, varyasyon_degerleri,
+        parametre_secenekleri[secilen_parametre], parametreler.get('cozunurluk', 500)
     )
     
     st.plotly_chart(duyarlilik_fig, use_container_width=True)
@@ -664,13 +703,19 @@ def parametre_analizini_goster_yeni(x_degerleri, parametreler):
     
     st.subheader("Parametre Etki Özeti")
     
+    # Izgara düzgün değil; ortalama trapez ağırlıklarıyla alınır
+    adimlar = np.diff(x_degerleri)
+    agirliklar = np.zeros(len(x_degerleri))
+    agirliklar[:-1] += adimlar / 2
+    agirliklar[1:] += adimlar / 2
+    
     etki_verileri = []
     for var_degeri, funding_degerleri in duyarlilik_verileri.items():
         etki_verileri.append({
             "Parametre Değeri": f"{var_degeri:.3f}",
             "Min Oran": f"{funding_degerleri.min():.4f}%",
             "Max Oran": f"{funding_degerleri.max():.4f}%",
-            "Ortalama": f"{funding_degerleri.mean():.4f}%",
+            "Ortalama": f"{np.average(funding_degerleri, weights=agirliklar):.4f}%",
             "Aralık": f"{funding_degerleri.max() - funding_degerleri.min():.4f}%"
         })
     
@@ -682,7 +727,7 @@ def gecis_bolgesi_analizini_goster_yeni(x_degerleri, combined_curve, gecis_bilgi
     st.subheader("Geçiş Bölgesi Detaylı Analizi")
     
     
-    gecis_fig = gecis_bolgesi_detay_grafigi_yeni(x_degerleri, combined_curve, gecis_bilgileri)
+    gecis_fig = app_cache.gecis_grafigi(app_cache.parametre_goruntusu(parametreler), parametreler.get('cozunurluk', 500))
     st.plotly_chart(gecis_fig, use_container_width=True)
     
     
@@ -708,15 +753,17 @@ def gecis_bolgesi_analizini_goster_yeni(x_degerleri, combined_curve, gecis_bilgi
         gecis_maskesi = ((x_degerleri >= gecis_bilgileri['baslangic']) & 
                         (x_degerleri <= gecis_bilgileri['bitis']))
         
-        if np.any(gecis_maskesi):
+        if np.count_nonzero(gecis_maskesi) > 1:
             gecis_funding = combined_curve[gecis_maskesi]
+            # Izgara düzgün değil: eğim x'e göre alınıp düzgün ızgaradaki adım boyuna ölçeklenir
+            adim_egimi = np.gradient(gecis_funding, x_degerleri[gecis_maskesi]) / (parametreler.get('cozunurluk', 500) - 1)
             
             gecis_kalite_df = pd.DataFrame([
                 {"Metrik": "Geçiş Bölgesi Min", "Değer": f"{gecis_funding.min():.4f}%"},
                 {"Metrik": "Geçiş Bölgesi Max", "Değer": f"{gecis_funding.max():.4f}%"},
                 {"Metrik": "Geçiş Değer Aralığı", "Değer": f"{gecis_funding.max() - gecis_funding.min():.4f}%"},
                 {"Metrik": "Geçiş Nokta Sayısı", "Değer": f"{len(gecis_funding)}"},
-                {"Metrik": "Pürüzsüzlük Skoru", "Değer": f"{1 / (1 + np.std(np.gradient(gecis_funding))):.3f}"}
+                {"Metrik": "Pürüzsüzlük Skoru", "Değer": f"{1 / (1 + np.std(adim_egimi)):.3f}"}
             ])
             
             st.dataframe(gecis_kalite_df, use_container_width=True, hide_index=True)
@@ -726,16 +773,13 @@ def cap_analizini_goster(x_degerleri, parametreler):
     st.subheader("⚠️ Cap Değerlerinin Etkisi")
     
     
-    cap_analizi = cap_etkisi_analizi(x_degerleri, parametreler, parametreler['min_cap'], parametreler['max_cap'])
+    goruntu = app_cache.parametre_goruntusu(parametreler)
     
     
-    cap_fig = cap_etkisi_grafigi(
-        x_degerleri, 
-        cap_analizi['orijinal_curve'], 
-        cap_analizi['capli_curve'],
-        parametreler['min_cap'], 
-        parametreler['max_cap']
-    )
+    cap_analizi = app_cache.cap_analizi(goruntu, parametreler.get('cozunurluk', 500))
+    
+    
+    cap_fig = app_cache.cap_grafigi(goruntu, parametreler.get('cozunurluk', 500))
     
     st.plotly_chart(cap_fig, use_container_width=True)
     
@@ -745,12 +789,15 @@ def cap_analizini_goster(x_degerleri, parametreler):
     with col1:
         st.subheader("Cap Etki İstatistikleri")
         
+        def araliklari_yaz(araliklar):
+            return ", ".join(f"[{a:.4f}, {b:.4f}]" for a, b in araliklar) or "-"
+        
         cap_istatistik_df = pd.DataFrame([
-            {"Metrik": "Min Cap'te Kesilen Nokta", "Değer": f"{cap_analizi['min_kesilen_nokta']}"},
-            {"Metrik": "Max Cap'te Kesilen Nokta", "Değer": f"{cap_analizi['max_kesilen_nokta']}"},
-            {"Metrik": "Toplam Kesilen Nokta", "Değer": f"{cap_analizi['toplam_kesilen']}"},
-            {"Metrik": "Toplam Nokta Sayısı", "Değer": f"{cap_analizi['toplam_nokta']}"},
-            {"Metrik": "Kesinti Oranı", "Değer": f"{cap_analizi['toplam_kesilen'] / cap_analizi['toplam_nokta'] * 100:.1f}%"}
+            {"Metrik": "Min Cap Aralıkları", "Değer": araliklari_yaz(cap_analizi['min_kesilen_araliklar'])},
+            {"Metrik": "Max Cap Aralıkları", "Değer": araliklari_yaz(cap_analizi['max_kesilen_araliklar'])},
+            {"Metrik": "Min Cap'te Kesilen Pozisyon", "Değer": f"{cap_analizi['min_kesilen_oran'] * 100:.2f}%"},
+            {"Metrik": "Max Cap'te Kesilen Pozisyon", "Değer": f"{cap_analizi['max_kesilen_oran'] * 100:.2f}%"},
+            {"Metrik": "Kesinti Oranı", "Değer": f"{cap_analizi['kesinti_orani'] * 100:.2f}%"}
         ])
         
         st.dataframe(cap_istatistik_df, use_container_width=True, hide_index=True)
@@ -772,8 +819,8 @@ def cap_analizini_goster(x_degerleri, parametreler):
         
         st.dataframe(cap_oneri_df, use_container_width=True, hide_index=True)
         
-        if cap_analizi['toplam_kesilen'] > 0:
-            st.warning(f"⚠️ {cap_analizi['toplam_kesilen']} nokta cap tarafından kesiliyor!")
+        if cap_analizi['kesinti_orani'] > 0:
+            st.warning(f"⚠️ Pozisyon ekseninin %{cap_analizi['kesinti_orani'] * 100:.2f}'i cap tarafından kesiliyor!")
         else:
             st.success("✅ Cap değerleri etkili değil - tüm eğri korunuyor")
 
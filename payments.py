@@ -0,0 +1,125 @@
+import math
+import os
+
+import numpy as np
+
+# Defterdeki tek kayıt; taraf: +1 long, -1 short. odeme > 0 hesaba alacak, < 0 borç
+ODEME_KAYDI = np.dtype([
+    ('kesim_zamani', '<i8'),
+    ('hesap_id', '<i8'),
+    ('taraf', 'i1'),
+    ('notional', '<f8'),
+    ('funding_orani', '<f8'),
+    ('odeme', '<f8')
+])
+
+def _taraflari_dogrula(taraflar, parca_boyutu=1_000_000):
+
+    # taraf ödemeyle çarpılır ve i1 saklanır: 0, 2 ya da 255 sessizce yanlış ödeme üretir
+    for baslangic in range(0, len(taraflar), parca_boyutu):
+        if not np.isin(taraflar[baslangic:baslangic + parca_boyutu], (-1, 1)).all():
+            raise ValueError("taraflar yalnızca +1 (long) veya -1 (short) olabilir")
+
+def funding_odemelerini_hesapla(notional, taraflar, funding_orani, out=None):
+    """
+    Pozitif oran long ağırlıklı pozisyonda oluşur: long öder, short alır. Negatifte tersi.
+    funding_orani yüzde cinsindendir (cift_s_curve_sistemi_yeni çıktısı gibi).
+    """
+
+    notional = np.asarray(notional, dtype=np.float64)
+    _taraflari_dogrula(np.ravel(taraflar))
+    if out is None:
+        out = np.empty(notional.shape, dtype=np.float64)
+
+    np.multiply(notional, -funding_orani / 100.0, out=out)
+    np.multiply(out, taraflar, out=out)
+    return out
+
+def odeme_parcalari(hesap_idleri, notional, taraflar, funding_orani, kesim_zamani=0, parca_boyutu=1_000_000):
+    """
+    Pozisyon dizilerini (memmap de olabilir) parça parça dolaşıp ODEME_KAYDI dizileri üretir.
+    Aynı kayıt tamponu her parçada yeniden kullanılır; üretilen dizi bir sonraki adımda üzerine yazılır.
+    """
+
+    n = len(notional)
+    if len(hesap_idleri) != n or len(taraflar) != n:
+        raise ValueError("hesap_idleri, notional ve taraflar aynı uzunlukta olmalı")
+    if parca_boyutu <= 0:
+        raise ValueError("parca_boyutu pozitif olmalı")
+    # Deftere yarım kesim yazılmasın diye taraflar ilk parça üretilmeden önce denetlenir
+    _taraflari_dogrula(taraflar, parca_boyutu)
+
+    tampon = np.empty(min(parca_boyutu, n), dtype=ODEME_KAYDI)
+    for baslangic in range(0, n, parca_boyutu):
+        bitis = min(baslangic + parca_boyutu, n)
+        kayitlar = tampon[:bitis - baslangic]
+
+        kayitlar['kesim_zamani'] = kesim_zamani
+        kayitlar['hesap_id'] = hesap_idleri[baslangic:bitis]
+        kayitlar['taraf'] = taraflar[baslangic:bitis]
+        kayitlar['notional'] = notional[baslangic:bitis]
+        kayitlar['funding_orani'] = funding_orani
+        kayitlar['odeme'] = funding_odemelerini_hesapla(
+            kayitlar['notional'], kayitlar['taraf'], funding_orani
+        )
+        yield kayitlar
+
+def odemeleri_deftere_yaz(defter_yolu, hesap_idleri, notional, taraflar, funding_orani,
+                          kesim_zamani=0, parca_boyutu=1_000_000):
+    """
+    Bir kesimin ödemelerini defter dosyasının sonuna parça parça ekler ve özetini döndürür.
+    """
+
+    long_odenen = []
+    short_odenen = []
+    kayit_sayisi = 0
+
+    with open(defter_yolu, 'ab') as f:
+        for kayitlar in odeme_parcalari(hesap_idleri, notional, taraflar, funding_orani,
+                                        kesim_zamani, parca_boyutu):
+            kayitlar.tofile(f)
+            long_mu = kayitlar['taraf'] > 0
+            long_odenen.append(float(kayitlar['odeme'][long_mu].sum()))
+            short_odenen.append(float(kayitlar['odeme'][~long_mu].sum()))
+            kayit_sayisi += len(kayitlar)
+        f.flush()
+        os.fsync(f.fileno())
+
+    long_toplam = math.fsum(long_odenen)
+    short_toplam = math.fsum(short_odenen)
+    return {
+        'kayit_sayisi': kayit_sayisi,
+        'funding_orani': funding_orani,
+        'long_toplam_odeme': long_toplam,
+        'short_toplam_odeme': short_toplam,
+        'net_odeme': long_toplam + short_toplam
+    }
+
+def defteri_oku(defter_yolu):
+    """
+    Defteri kopyasız, salt okunur ODEME_KAYDI memmap'i olarak açar.
+    """
+
+    if os.path.getsize(defter_yolu) == 0:
+        return np.empty(0, dtype=ODEME_KAYDI)
+    return np.memmap(defter_yolu, dtype=ODEME_KAYDI, mode='r')
+
+def hesap_bakiyeleri(defter_yolu, parca_boyutu=1_000_000):
+    """
+    Defterdeki ödemeleri hesap bazında toplar: (hesap_idleri, bakiyeler).
+    """
+
+    defter = defteri_oku(defter_yolu)
+    hesaplar = []
+    toplamlar = []
+    for baslangic in range(0, len(defter), parca_boyutu):
+        parca = defter[baslangic:baslangic + parca_boyutu]
+        idler, ters = np.unique(parca['hesap_id'], return_inverse=True)
+        hesaplar.append(idler)
+        toplamlar.append(np.bincount(ters, weights=parca['odeme'], minlength=len(idler)))
+
+    if not hesaplar:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    idler, ters = np.unique(np.concatenate(hesaplar), return_inverse=True)
+    return idler, np.bincount(ters, weights=np.concatenate(toplamlar), minlength=len(idler))
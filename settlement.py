@@ -0,0 +1,245 @@
+import heapq
+
+import numpy as np
+
+from curve_functions import BolgeIndeksi, FundingCurve, cift_s_curve_sistemi_yeni
+
+def kesim_dakikalarini_bul(oranlar, funding_bolgeleri, baslangic_saati=8, varsayilan_saat=8):
+    """
+    Dakikalık oran serisinde kesim dakikalarını ve her kesimde seçilen bir sonraki saati bulur.
+    Yalnızca kesim dakikalarına bakılır; bir dönemin saati bir önceki kesimde belirlenir.
+    """
+
+    bolge_indeksi = BolgeIndeksi(funding_bolgeleri, varsayilan_saat)
+    n = len(oranlar)
+
+    kesim_indeksleri = []
+    uygulanan_saatler = []
+    sonraki_saatler = []
+
+    saat = baslangic_saati
+    indeks = -1
+    while True:
+        dakika = int(round(saat * 60))
+        if dakika <= 0:
+            raise ValueError(f"Geçersiz funding saati: {saat}")
+
+        indeks += dakika
+        if indeks >= n:
+            break
+
+        # Dönemin son dakikasındaki oran hem kesimi hem de bir sonraki saati belirler
+        sonraki_saat = bolge_indeksi.saat(float(oranlar[indeks]))
+
+        kesim_indeksleri.append(indeks)
+        uygulanan_saatler.append(saat)
+        sonraki_saatler.append(sonraki_saat)
+        saat = sonraki_saat
+
+    return (np.array(kesim_indeksleri, dtype=np.int64),
+            np.array(uygulanan_saatler, dtype=float),
+            np.array(sonraki_saatler, dtype=float))
+
+def funding_kesimlerini_oynat(oranlar, parametreler, baslangic_saati=8, baslangic_zamani=0):
+    """
+    Dakikalık pozisyon oranı serisini (0 = tam short, 1 = tam long) README'deki kurallarla oynatır.
+
+    oranlar[i], baslangic_zamani + i * 60 saniyesinde başlayan dakikanın oranıdır.
+    Kesim zamanı, dönemin son dakikasının bittiği andır (epoch saniye).
+    """
+
+    oranlar = np.asarray(oranlar, dtype=float)
+    if oranlar.ndim != 1:
+        raise ValueError("oranlar tek boyutlu bir dakika serisi olmalı")
+
+    kesim_indeksleri, uygulanan_saat, sonraki_saat = kesim_dakikalarini_bul(
+        oranlar, parametreler.get('funding_bolgeleri', []), baslangic_saati
+    )
+
+    kesim_oranlari = oranlar[kesim_indeksleri]
+    funding_oranlari, _, _ = cift_s_curve_sistemi_yeni(
+        kesim_oranlari,
+        parametreler['short_min_oran'], parametreler['short_max_oran'],
+        parametreler['short_orta_nokta'], parametreler['short_diklik'],
+        parametreler['long_min_oran'], parametreler['long_max_oran'],
+        parametreler['long_orta_nokta'], parametreler['long_diklik'],
+        parametreler['gecis_genisligi'], parametreler['min_cap'], parametreler['max_cap']
+    )
+
+    return {
+        'kesim_indeksleri': kesim_indeksleri,
+        'kesim_zamanlari': baslangic_zamani + (kesim_indeksleri + 1) * 60,
+        'oranlar': kesim_oranlari,
+        'funding_oranlari': funding_oranlari,
+        'uygulanan_saat': uygulanan_saat,
+        'sonraki_saat': sonraki_saat
+    }
+
+def coklu_yol_kesimleri(oran_matrisi, parametreler, baslangic_saati=8, varsayilan_saat=8):
+    """
+    (yol, dakika) oran matrisinin tüm satırlarını birlikte oynatır; her adımda yalnızca
+    satırların sıradaki kesim dakikaları okunur. Kesim sayısı satırdan satıra değiştiği için
+    sonuçlar (yol, max_kesim) boyutunda; boş hücrelerde indeks -1, funding 0'dır.
+    """
+
+    oran_matrisi = np.asarray(oran_matrisi)
+    if oran_matrisi.ndim != 2:
+        raise ValueError("oran_matrisi (yol, dakika) şeklinde olmalı")
+
+    yol_sayisi, n = oran_matrisi.shape
+    bolge_indeksi = BolgeIndeksi(parametreler.get('funding_bolgeleri', []), varsayilan_saat)
+    satirlar = np.arange(yol_sayisi)
+
+    indeksler = np.full(yol_sayisi, -1, dtype=np.int64)
+    saatler = np.full(yol_sayisi, float(baslangic_saati))
+
+    kesim_adimlari = []
+    oran_adimlari = []
+    saat_adimlari = []
+    while True:
+        dakikalar = np.rint(saatler * 60).astype(np.int64)
+        if np.any(dakikalar <= 0):
+            raise ValueError("Funding saatleri pozitif olmalı")
+
+        sonraki = indeksler + dakikalar
+        aktif = sonraki < n
+        if not aktif.any():
+            break
+
+        oranlar = oran_matrisi[satirlar, np.minimum(sonraki, n - 1)]
+        sonraki_saatler = bolge_indeksi.siniflandir(oranlar)[0].astype(float)
+
+        kesim_adimlari.append(np.where(aktif, sonraki, -1))
+        oran_adimlari.append(oranlar)
+        saat_adimlari.append(saatler.copy())
+
+        # Bitmiş satırlar yerinde kalır; sonraki adımlarda da aktif olmazlar
+        indeksler = np.where(aktif, sonraki, indeksler)
+        saatler = np.where(aktif, sonraki_saatler, saatler)
+
+    if not kesim_adimlari:
+        bos = np.empty((yol_sayisi, 0))
+        return {'kesim_indeksleri': bos.astype(np.int64), 'funding_oranlari': bos, 'uygulanan_saat': bos}
+
+    kesim_indeksleri = np.stack(kesim_adimlari, axis=1)
+    gecerli = kesim_indeksleri >= 0
+
+    funding_oranlari = FundingCurve(parametreler).hesapla(np.stack(oran_adimlari, axis=1).astype(float))
+    funding_oranlari[~gecerli] = 0.0
+
+    return {
+        'kesim_indeksleri': kesim_indeksleri,
+        'funding_oranlari': funding_oranlari,
+        'uygulanan_saat': np.where(gecerli, np.stack(saat_adimlari, axis=1), 0.0)
+    }
+
+def kesim_ozeti(kesimler):
+
+    funding_oranlari = kesimler['funding_oranlari']
+    return {
+        'kesim_sayisi': len(funding_oranlari),
+        'toplam_funding': float(funding_oranlari.sum()),
+        'ortalama_funding': float(funding_oranlari.mean()) if len(funding_oranlari) else 0.0,
+        'ortalama_saat': float(kesimler['uygulanan_saat'].mean()) if len(funding_oranlari) else 0.0
+    }
+
+def pozisyon_orani(long_oi, short_oi):
+
+    toplam = long_oi + short_oi
+    if toplam <= 0:
+        return 0.5
+    return long_oi / toplam
+
+class CanliKesimTakipcisi:
+    """
+    (zaman, market, long_oi, short_oi) tick'lerini işleyip dönem bittiğinde kesim olayı üretir.
+    Market başına yalnızca [donem_sonu, son_oran, saat] tutulur.
+    Kesim, dönem sonundan önce görülen son orana göre yapılır; aynı oran bir sonraki saati de belirler.
+    Dönem sonları bir yığında tutulur: her tick, tick gelmeyen marketler dahil süresi dolan
+    tüm dönemleri zaman sırasıyla keser.
+    """
+
+    def __init__(self, parametreler, baslangic_saati=8, baslangic_zamani=None, varsayilan_saat=8):
+
+        self.egri = FundingCurve(parametreler)
+        self.bolge_indeksi = BolgeIndeksi(parametreler.get('funding_bolgeleri', []), varsayilan_saat)
+        self.baslangic_saati = baslangic_saati
+        self.baslangic_zamani = baslangic_zamani
+        self.durumlar = {}
+        # (donem_sonu, sira, market); her marketin yığında tek kaydı vardır
+        self.kesim_sirasi = []
+        self._sira = 0
+
+    def _siraya_ekle(self, market, durum):
+
+        heapq.heappush(self.kesim_sirasi, (durum[0], self._sira, market))
+        self._sira += 1
+
+    def _kesim_yap(self, market, durum):
+
+        oran = durum[1]
+        sonraki_saat = self.bolge_indeksi.saat(oran)
+        olay = {
+            'market': market,
+            'zaman': durum[0],
+            'oran': oran,
+            'funding_orani': self.egri.deger(oran),
+            'saat': durum[2],
+            'sonraki_saat': sonraki_saat
+        }
+        durum[0] += sonraki_saat * 3600
+        durum[2] = sonraki_saat
+        self._siraya_ekle(market, durum)
+        return olay
+
+    def isle(self, zaman, market, long_oi, short_oi):
+        """
+        Tek tick işler; bu tick'ten önce dolan (tüm marketlerdeki) dönemlerin kesim olaylarını
+        zaman sırasıyla liste olarak döndürür.
+        """
+
+        oran = pozisyon_orani(long_oi, short_oi)
+        durum = self.durumlar.get(market)
+
+        if durum is None:
+            baslangic = zaman if self.baslangic_zamani is None else self.baslangic_zamani
+            durum = [baslangic + self.baslangic_saati * 3600, oran, self.baslangic_saati]
+            self.durumlar[market] = durum
+            self._siraya_ekle(market, durum)
+
+        # Arada tick gelmediyse geçen her dönem aynı son oranla kesilir
+        olaylar = self.zamani_ilerlet(zaman)
+        durum[1] = oran
+        return olaylar
+
+    def zamani_ilerlet(self, zaman):
+        """
+        Saati zaman'a ilerletir; süresi dolan tüm dönemleri keser. Market başına O(log market).
+        """
+
+        olaylar = []
+        while self.kesim_sirasi and self.kesim_sirasi[0][0] <= zaman:
+            _, _, market = heapq.heappop(self.kesim_sirasi)
+            olaylar.append(self._kesim_yap(market, self.durumlar[market]))
+        return olaylar
+
+def kesim_olaylarini_uret(tickler, parametreler, baslangic_saati=8, baslangic_zamani=None):
+    """
+    Tick akışından kesim olaylarını sırayla üreten generator. Her tick'in zamanı tüm marketlerin
+    saatini ilerletir; sessiz marketlerin kesimi de dönem bittiği ilk tick'te üretilir.
+    """
+
+    takipci = CanliKesimTakipcisi(parametreler, baslangic_saati, baslangic_zamani)
+    for zaman, market, long_oi, short_oi in tickler:
+        yield from takipci.isle(zaman, market, long_oi, short_oi)
+
+def depodan_kesimleri_oynat(depo, market, parametreler, baslangic=None, bitis=None, baslangic_saati=8):
+    """
+    PozisyonDeposu'ndaki [baslangic, bitis) epoch dakika aralığını doğrudan oynatır.
+    """
+
+    ilk, _ = depo.aralik(market)
+    baslangic = ilk if baslangic is None else max(int(baslangic), ilk)
+    return funding_kesimlerini_oynat(
+        depo.oran(market, baslangic, bitis), parametreler, baslangic_saati, baslangic_zamani=baslangic * 60
+    )
@@ -0,0 +1,140 @@
+import json
+import os
+
+import numpy as np
+
+BASLIK_DOSYASI = 'baslik.json'
+SUTUNLAR = ('long_oi', 'short_oi')
+VERI_TIPI = '<f8'
+
+class PozisyonDeposu:
+    """
+    Dakikalık long/short open interest geçmişi için sütunlu disk formatı.
+
+    kok_dizin/baslik.json  -> market başına baslangic_dakikasi (epoch dakika) ve uzunluk
+    kok_dizin/<market>/<sutun>.bin -> ham little-endian float64 blok, boşluksuz dakika serisi
+
+    Veriler np.memmap ile açılır, zaman aralığı dilimleri kopyasız okunur.
+    Başlık veriden sonra atomik olarak yazılır; yarım kalan bir ekleme başlıktaki uzunluğun
+    ötesinde kalır ve bir sonraki eklemede kırpılır.
+    """
+
+    def __init__(self, kok_dizin):
+
+        self.kok_dizin = kok_dizin
+        os.makedirs(kok_dizin, exist_ok=True)
+
+        baslik_yolu = os.path.join(kok_dizin, BASLIK_DOSYASI)
+        if os.path.exists(baslik_yolu):
+            with open(baslik_yolu, 'r', encoding='utf-8') as f:
+                self.baslik = json.load(f)
+        else:
+            self.baslik = {'surum': 1, 'veri_tipi': VERI_TIPI, 'sutunlar': list(SUTUNLAR), 'marketler': {}}
+
+    def _baslik_yaz(self):
+
+        baslik_yolu = os.path.join(self.kok_dizin, BASLIK_DOSYASI)
+        gecici_yol = baslik_yolu + '.tmp'
+        with open(gecici_yol, 'w', encoding='utf-8') as f:
+            json.dump(self.baslik, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici_yol, baslik_yolu)
+
+    def _dosya_yolu(self, market, sutun):
+
+        return os.path.join(self.kok_dizin, market, f"{sutun}.bin")
+
+    def marketler(self):
+
+        return list(self.baslik['marketler'])
+
+    def aralik(self, market):
+        """
+        Marketin kayıtlı [baslangic, bitis) epoch dakika aralığı.
+        """
+
+        bilgi = self.baslik['marketler'][market]
+        return bilgi['baslangic_dakikasi'], bilgi['baslangic_dakikasi'] + bilgi['uzunluk']
+
+    def ekle(self, market, baslangic_dakikasi, long_oi, short_oi):
+        """
+        baslangic_dakikasi'ndan itibaren dakikalık değerleri marketin sonuna ekler.
+        Kayıtlı serinin sonu ile yeni blok arasındaki boşluk son değerle doldurulur.
+        """
+
+        if not market or os.sep in market or market.startswith('.'):
+            raise ValueError(f"Geçersiz market adı: {market!r}")
+
+        degerler = {
+            'long_oi': np.ascontiguousarray(long_oi, dtype=VERI_TIPI),
+            'short_oi': np.ascontiguousarray(short_oi, dtype=VERI_TIPI)
+        }
+        if degerler['long_oi'].ndim != 1 or degerler['long_oi'].shape != degerler['short_oi'].shape:
+            raise ValueError("long_oi ve short_oi aynı uzunlukta tek boyutlu diziler olmalı")
+
+        baslangic_dakikasi = int(baslangic_dakikasi)
+        bilgi = self.baslik['marketler'].get(market)
+
+        if bilgi is None:
+            os.makedirs(os.path.join(self.kok_dizin, market), exist_ok=True)
+            bilgi = {'baslangic_dakikasi': baslangic_dakikasi, 'uzunluk': 0}
+            bosluk = 0
+        else:
+            bosluk = baslangic_dakikasi - (bilgi['baslangic_dakikasi'] + bilgi['uzunluk'])
+            if bosluk < 0:
+                raise ValueError(f"{market} için {baslangic_dakikasi} dakikası zaten kayıtlı")
+            if bosluk > 0 and bilgi['uzunluk'] == 0:
+                bilgi['baslangic_dakikasi'] = baslangic_dakikasi
+                bosluk = 0
+
+        for sutun in SUTUNLAR:
+            yol = self._dosya_yolu(market, sutun)
+            blok = degerler[sutun]
+            if bosluk > 0:
+                son_deger = self.oku(market, sutun)[-1]
+                blok = np.concatenate([np.full(bosluk, son_deger, dtype=VERI_TIPI), blok])
+
+            with open(yol, 'r+b' if os.path.exists(yol) else 'wb') as f:
+                f.seek(bilgi['uzunluk'] * 8)
+                f.truncate()
+                blok.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+        bilgi['uzunluk'] += bosluk + len(degerler['long_oi'])
+        self.baslik['marketler'][market] = bilgi
+        self._baslik_yaz()
+
+    def _dilim(self, market, baslangic, bitis):
+
+        ilk, son = self.aralik(market)
+        baslangic = ilk if baslangic is None else min(max(int(baslangic), ilk), son)
+        bitis = son if bitis is None else min(max(int(bitis), baslangic), son)
+        return baslangic - ilk, bitis - ilk
+
+    def oku(self, market, sutun, baslangic=None, bitis=None):
+        """
+        [baslangic, bitis) epoch dakika aralığını salt okunur memmap dilimi olarak döndürür.
+        """
+
+        uzunluk = self.baslik['marketler'][market]['uzunluk']
+        i, j = self._dilim(market, baslangic, bitis)
+        if uzunluk == 0 or i == j:
+            return np.empty(0, dtype=VERI_TIPI)
+
+        dizi = np.memmap(self._dosya_yolu(market, sutun), dtype=VERI_TIPI, mode='r', shape=(uzunluk,))
+        return dizi[i:j]
+
+    def oran(self, market, baslangic=None, bitis=None):
+        """
+        Dakikalık long oranı: long / (long + short), ikisi de sıfırsa 0.5.
+        """
+
+        long_oi = self.oku(market, 'long_oi', baslangic, bitis)
+        short_oi = self.oku(market, 'short_oi', baslangic, bitis)
+
+        toplam = long_oi + short_oi
+        oranlar = np.full(len(toplam), 0.5)
+        np.divide(long_oi, toplam, out=oranlar, where=toplam > 0)
+        return oranlar
@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+
+from settlement import coklu_yol_kesimleri
+
+DAKIKA_GUN = 1440
+
+YUZDELIKLER = (1, 5, 25, 50, 75, 95, 99)
+
+# Her yol bloğu kendi rastgele akışını kullanır; sonuçlar yalnızca tohuma bağlıdır, bellek limitine değil
+YOL_BLOGU = 128
+
+# oran_yollari_uret'te aynı anda işlenen satır x dakika eleman sayısı (float64 ~256 KB)
+SATIR_GRUBU_ELEMAN = 1 << 15
+
+# Logit uzayında ortalamaya dönen süreç ve sıçramalar için varsayılan model
+VARSAYILAN_MODEL = {
+    'ortalama_oran': 0.5,
+    'yari_omur_saat': 12.0,
+    'oynaklik': 0.02,
+    'gunluk_sicrama_sayisi': 1.0,
+    'sicrama_boyutu': 1.0,
+    'baslangic_orani': None
+}
+
+def _logit(p):
+
+    p = min(max(p, 1e-9), 1 - 1e-9)
+    return math.log(p / (1 - p))
+
+def oran_yollari_uret(yol_sayisi, dakika_sayisi, rng, model=None, blok_boyutu=None, out=None):
+    """
+    Sınırlı (0, 1) pozisyon oranı yolları: z = logit(oran) ayrık OU süreci,
+    z[t] = phi * z[t-1] + (1 - phi) * mu + oynaklik * e[t] + sicrama[t].
+
+    Özyineleme blok blok cumsum ile çözülür: z[t] = phi^t * (z0 + sum(phi^-s * eta[s])).
+    Blok boyu phi^-B taşmayacak şekilde seçilir. Yenilikler float32 çekilir, yalnızca cumsum
+    biriktiricisi float64'tür. Satırlar önbelleğe sığan gruplarla işlenir; her blok önbellekteyken
+    tek seferde çıktıya yazılır. Sonuç float32 (yol, dakika) dizisidir.
+    """
+
+    model = dict(VARSAYILAN_MODEL, **(model or {}))
+
+    phi = 0.5 ** (1 / (model['yari_omur_saat'] * 60))
+    theta = -math.log(phi)
+    mu = _logit(model['ortalama_oran'])
+    sabit = (1 - phi) * mu
+    sicrama_olasiligi = model['gunluk_sicrama_sayisi'] / DAKIKA_GUN
+
+    if blok_boyutu is None:
+        blok_boyutu = DAKIKA_GUN if theta == 0 else max(1, min(DAKIKA_GUN, int(30 / theta)))
+    satir_grubu = max(1, min(yol_sayisi, SATIR_GRUBU_ELEMAN // blok_boyutu))
+
+    if out is None:
+        out = np.empty((yol_sayisi, dakika_sayisi), dtype=np.float32)
+
+    uslar = np.arange(1, blok_boyutu + 1)
+    ileri = phi ** uslar
+    geri = phi ** -uslar
+    # eta * phi^-s = e * (oynaklik * phi^-s) + sabit * phi^-s; oran = 0.5 + 0.5 * tanh(z / 2)
+    gurultu_agirligi = model['oynaklik'] * geri
+    sabit_agirligi = sabit * geri
+    yarim_ileri = 0.5 * ileri
+
+    gurultu = np.empty(satir_grubu * blok_boyutu, dtype=np.float32)
+    biriktirici = np.empty(satir_grubu * blok_boyutu)
+
+    baslangic_orani = model['baslangic_orani']
+    z0 = mu if baslangic_orani is None else _logit(baslangic_orani)
+
+    for ilk in range(0, yol_sayisi, satir_grubu):
+        g = min(satir_grubu, yol_sayisi - ilk)
+        z = np.full(g, z0)
+
+        for baslangic in range(0, dakika_sayisi, blok_boyutu):
+            b = min(blok_boyutu, dakika_sayisi - baslangic)
+
+            e = gurultu[:g * b].reshape(g, b)
+            rng.standard_normal(dtype=np.float32, out=e)
+            eta = biriktirici[:g * b].reshape(g, b)
+            np.multiply(e, gurultu_agirligi[:b], out=eta)
+            eta += sabit_agirligi[:b]
+            # Önceki bloğun son değeri ilk kolona eklenir, cumsum onu tüm bloğa taşır
+            eta[:, 0] += z
+
+            # Sıçramalar seyrek: toplam sayı Poisson, konumlar düzgün dağılımlı
+            sicrama_sayisi = rng.poisson(sicrama_olasiligi * g * b)
+            if sicrama_sayisi:
+                yollar = rng.integers(0, g, sicrama_sayisi)
+                dakikalar = rng.integers(0, b, sicrama_sayisi)
+                np.add.at(eta, (yollar, dakikalar),
+                          rng.normal(0.0, model['sicrama_boyutu'], sicrama_sayisi) * geri[dakikalar])
+
+            np.cumsum(eta, axis=1, out=eta)
+            z = eta[:, -1] * ileri[b - 1]
+
+            blok = out[ilk:ilk + g, baslangic:baslangic + b]
+            np.multiply(eta, yarim_ileri[:b], out=blok)
+            np.tanh(blok, out=blok)
+            blok *= 0.5
+            blok += 0.5
+
+    return out
+
+def _dagilim_ozeti(degerler):
+
+    ozet = {'ortalama': float(degerler.mean()), 'standart_sapma': float(degerler.std())}
+    for yuzdelik, deger in zip(YUZDELIKLER, np.percentile(degerler, YUZDELIKLER)):
+        ozet[f'p{yuzdelik}'] = float(deger)
+    return ozet
+
+def stres_testi(senaryolar, yol_sayisi=10_000, gun_sayisi=30, tohum=0, model=None,
+                baslangic_saati=8, bellek_limiti_mb=256):
+    """
+    senaryolar: {isim: parametreler}. Tüm senaryolar aynı rastgele yollarla (ortak rastgele sayılar)
+    değerlendirilir, böylece senaryo farkları simülasyon gürültüsünden bağımsızdır.
+
+    Yollar YOL_BLOGU'luk bloklarda, her blok SeedSequence(tohum).spawn ile ayrı akıştan üretilir.
+    Bellek limiti yalnızca aynı anda tutulan blok sayısını belirler (en az bir blok), sonuçları değiştirmez.
+
+    Dönüş: senaryo başına
+      gunluk_funding (yol, gün) - o gün kesilen funding oranlarının toplamı (%)
+      yillik_funding (yol,) - ortalama günlük toplam x 365
+      gunluk_ozet / yillik_ozet - ortalama, standart sapma ve yüzdelikler
+    """
+
+    senaryolar = {isim: senaryo.get('parametreler', senaryo) for isim, senaryo in senaryolar.items()}
+    dakika_sayisi = gun_sayisi * DAKIKA_GUN
+
+    blok_sayisi = math.ceil(yol_sayisi / YOL_BLOGU)
+    parca_blok_sayisi = max(1, (bellek_limiti_mb * 2 ** 20) // (YOL_BLOGU * dakika_sayisi * 4))
+    parca_boyutu = min(yol_sayisi, parca_blok_sayisi * YOL_BLOGU)
+    tohumlar = np.random.SeedSequence(tohum).spawn(blok_sayisi)
+
+    gunluk = {isim: np.zeros((yol_sayisi, gun_sayisi)) for isim in senaryolar}
+    tampon = np.empty((parca_boyutu, dakika_sayisi), dtype=np.float32)
+
+    for ilk in range(0, yol_sayisi, parca_boyutu):
+        son = min(ilk + parca_boyutu, yol_sayisi)
+
+        for blok_ilk in range(ilk, son, YOL_BLOGU):
+            blok_son = min(blok_ilk + YOL_BLOGU, yol_sayisi)
+            oran_yollari_uret(blok_son - blok_ilk, dakika_sayisi,
+                              np.random.default_rng(tohumlar[blok_ilk // YOL_BLOGU]),
+                              model, out=tampon[blok_ilk - ilk:blok_son - ilk])
+        oranlar = tampon[:son - ilk]
+
+        for isim, parametreler in senaryolar.items():
+            kesimler = coklu_yol_kesimleri(oranlar, parametreler, baslangic_saati)
+            gecerli = kesimler['kesim_indeksleri'] >= 0
+
+            satirlar = np.broadcast_to(np.arange(son - ilk)[:, None], gecerli.shape)[gecerli]
+            gunler = kesimler['kesim_indeksleri'][gecerli] // DAKIKA_GUN
+            np.add.at(gunluk[isim][ilk:son], (satirlar, gunler), kesimler['funding_oranlari'][gecerli])
+
+    sonuclar = {}
+    for isim, gunluk_funding in gunluk.items():
+        yillik_funding = gunluk_funding.mean(axis=1) * 365
+        sonuclar[isim] = {
+            'gunluk_funding': gunluk_funding,
+            'yillik_funding': yillik_funding,
+            'gunluk_ozet': _dagilim_ozeti(gunluk_funding),
+            'yillik_ozet': _dagilim_ozeti(yillik_funding)
+        }
+
+    return sonuclar
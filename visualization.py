@@ -1,11 +1,64 @@
 # visualization.py
 
+import plotly
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
 import streamlit as st
-from config import RENKLER, METINLER
+from config import RENKLER, METINLER, ARAYUZ_AYARLARI
+
+# Plotly 6+ numpy dizilerini base64 tipli dizi olarak yollar; 5.x'te JSON listesine çevrilir
+# ve float32 değerler uzun ondalıklara genişleyip yükü büyütür
+_TIPLI_DIZI = int(plotly.__version__.split('.')[0]) >= 6
+
+def izi_seyrelt(x_degerleri, y_degerleri, piksel_sayisi=None):
+    """
+    M4 seyreltme: x ekseni piksel_sayisi kovaya bölünür, her kovada ilk, son, en küçük ve en büyük
+    nokta tutulur. Çizilen çizgi piksel düzeyinde aynı kalır; cap platoları ve kırılmalar kaybolmaz.
+    x artan sırada olmalı. Kova başına 4 noktadan az veri varsa dizi olduğu gibi döner.
+    """
+
+    x_degerleri = np.asarray(x_degerleri)
+    y_degerleri = np.asarray(y_degerleri)
+    if piksel_sayisi is None:
+        piksel_sayisi = ARAYUZ_AYARLARI['grafik_piksel_genisligi']
+
+    n = len(x_degerleri)
+    if n <= 4 * piksel_sayisi:
+        return x_degerleri, y_degerleri
+
+    x_ilk, x_son = float(x_degerleri[0]), float(x_degerleri[-1])
+    if x_son <= x_ilk:
+        return x_degerleri, y_degerleri
+
+    kovalar = ((x_degerleri - x_ilk) * (piksel_sayisi / (x_son - x_ilk))).astype(np.int64)
+    np.minimum(kovalar, piksel_sayisi - 1, out=kovalar)
+
+    # x sıralı olduğundan kovalar ardışık: sınırlar ilk/son noktaları verir
+    baslangiclar = np.flatnonzero(np.diff(kovalar, prepend=-1))
+    bitisler = np.append(baslangiclar[1:], n) - 1
+
+    # Kova içinde y'ye göre sıralama, grup başları en küçükleri ve grup sonları en büyükleri verir
+    y_sirasi = np.lexsort((y_degerleri, kovalar))
+    secilen = np.unique(np.concatenate([
+        baslangiclar, bitisler, y_sirasi[baslangiclar], y_sirasi[bitisler]
+    ]))
+    return x_degerleri[secilen], y_degerleri[secilen]
+
+def iz_verisi(x_degerleri, y_degerleri, piksel_sayisi=None):
+    """
+    go.Scatter için seyreltilmiş x/y. Tipli dizi desteklenen Plotly sürümlerinde float32'ye
+    çevrilir (nokta başına 4 bayt); eski sürümlerde float64 bırakılır.
+    """
+
+    x_degerleri, y_degerleri = izi_seyrelt(x_degerleri, y_degerleri, piksel_sayisi)
+    if not _TIPLI_DIZI:
+        return {'x': x_degerleri, 'y': y_degerleri}
+    return {
+        'x': np.asarray(x_degerleri, dtype=np.float32),
+        'y': np.asarray(y_degerleri, dtype=np.float32)
+    }
 
 def ana_grafigi_olustur_yeni(x_degerleri, combined_curve, 
                             funding_bolgeleri=None, gecis_baslangic=None, gecis_bitis=None,
@@ -69,8 +122,7 @@ def ana_grafigi_olustur_yeni(x_degerleri, combined_curve,
     
     fig.add_trace(
         go.Scatter(
-            x=x_degerleri,
-            y=combined_curve,
+            **iz_verisi(x_degerleri, combined_curve),
             mode='lines',
             name='Funding Oranı',
             line=dict(
@@ -215,6 +267,97 @@ def ana_grafigi_olustur_yeni(x_degerleri, combined_curve,
     
     return fig
 
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _slider_taban_grafigi(x_degerleri, combined_curve, funding_bolgeleri):
+
+    fig = go.Figure()
+    
+    fig.add_trace(
+        go.Scatter(
+            **iz_verisi(x_degerleri, combined_curve),
+            mode='lines',
+            name='Funding Oranı',
+            line=dict(color='#00D2FF', width=4, shape='spline'),
+            hovertemplate='Pozisyon: %{x:.6f}<br>Funding: %{y:.6f}%<extra></extra>',
+            fill='tonexty'
+        )
+    )
+    
+    if funding_bolgeleri:
+        renk_paleti = [
+            '#FFE5E5',  
+            '#FFE5CC',  
+            '#E5F3FF',
+            '#E5FFE5', 
+            '#F0E5FF'  
+        ]
+        
+        for i, bolge in enumerate(funding_bolgeleri):
+            renk = renk_paleti[i % len(renk_paleti)]
+            
+            fig.add_vrect(
+                x0=bolge['baslangic'], 
+                x1=bolge['bitis'],
+                fillcolor=renk,
+                opacity=0.4,
+                layer="below",
+                line_width=0
+            )
+            
+            orta_x = (bolge['baslangic'] + bolge['bitis']) / 2
+            max_y = max(combined_curve)
+            
+            fig.add_annotation(
+                x=orta_x,
+                y=max_y * 0.9,
+                text=f"<b>{bolge['saat']}h</b><br>{bolge['etiket'].split('(')[0].strip()}",
+                showarrow=False,
+                font=dict(size=11, color='#2C3E50'),
+                bgcolor="rgba(255,255,255,0.8)",
+                bordercolor="#BDC3C7",
+                borderwidth=1,
+                borderpad=4
+            )
+    
+    fig.add_hline(y=0, line_color='white', line_width=2, opacity=0.8)
+    
+    fig.update_layout(
+        title=dict(
+            text="<b>Seçilen Pozisyonda Dinamik Funding</b>",
+            x=0.5,
+            font=dict(size=16, color='white')
+        ),
+        xaxis_title="Pozisyon Oranı (0=Short, 1=Long)",
+        yaxis_title="Funding Oranı (%)",
+        height=400,
+        template="plotly_dark",
+        showlegend=False,
+        paper_bgcolor='#1a1a1a',
+        plot_bgcolor='#2d2d2d',
+        margin=dict(t=60, b=60, l=60, r=60),
+        font=dict(family="Arial", size=12, color='white')
+    )
+    
+    fig.update_xaxes(
+        range=[0, 1], 
+        tickformat='.3f',
+        gridcolor='rgba(255,255,255,0.2)',
+        title_font=dict(size=14, color='white'),
+        tickfont=dict(color='white')
+    )
+    fig.update_yaxes(
+        tickformat='.4f',
+        gridcolor='rgba(255,255,255,0.2)',
+        title_font=dict(size=14, color='white'),
+        tickfont=dict(color='white')
+    )
+    
+    return fig
+
+# Slider yalnızca kendi bölümünü yeniden çalıştırır; eski Streamlit sürümlerinde tüm sayfa çalışır
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda fonksiyon: fonksiyon)
+
+@_fragment
 def pozisyon_slider_widget(x_degerleri, combined_curve, parametreler):
 
     st.subheader("Anlık Pozisyon Analizi - Dinamik Funding")
@@ -226,13 +369,15 @@ def pozisyon_slider_widget(x_degerleri, combined_curve, parametreler):
         value=0.500000,
         step=0.000001,
         format="%.6f",
-        help="0.000000 = Tam Short, 1.000000 = Tam Long"
+        help="0.000000 = Tam Short, 1.000000 = Tam Long",
+        key="pozisyon_slider"
     )
     
-    from curve_functions import belirli_pozisyondaki_funding_hesapla, funding_oran_hesaplamalari_dinamik
+    from curve_functions import belirli_pozisyondaki_bolge_hesapla, funding_oran_hesaplamalari_dinamik
     
     try:
-        funding_orani, saat_dilimi = belirli_pozisyondaki_funding_hesapla(pozisyon, parametreler)
+        # Bölge de önbellekteki derlenmiş eğrinin indeksinden gelir; her harekette indeks kurulmaz
+        funding_orani, saat_dilimi, bolge_id = belirli_pozisyondaki_bolge_hesapla(pozisyon, parametreler)
         
         if isinstance(funding_orani, (list, tuple, np.ndarray)):
             funding_orani = float(funding_orani[0]) if len(funding_orani) > 0 else 0.0
@@ -245,13 +390,10 @@ def pozisyon_slider_widget(x_degerleri, combined_curve, parametreler):
         st.error(f"Funding hesaplama hatası: {e}")
         funding_orani = 0.0
         saat_dilimi = 8
+        bolge_id = -1
     
-    bolge_bilgisi = None
     funding_bolgeleri = parametreler.get('funding_bolgeleri', [])
-    for bolge in funding_bolgeleri:
-        if bolge['baslangic'] <= pozisyon <= bolge['bitis']:
-            bolge_bilgisi = bolge
-            break
+    bolge_bilgisi = funding_bolgeleri[bolge_id] if bolge_id >= 0 else None
     
     col1, col2 = st.columns(2)
     
@@ -322,55 +464,8 @@ def pozisyon_slider_widget(x_degerleri, combined_curve, parametreler):
     
     st.info(f"💡 Bu pozisyonda funding her **{saat_dilimi} saat**te bir kesilir. Ekstrem pozisyonlarda sıklık artar!")
     
-    fig_slider = go.Figure()
-    
-    fig_slider.add_trace(
-        go.Scatter(
-            x=x_degerleri,
-            y=combined_curve,
-            mode='lines',
-            name='Funding Oranı',
-            line=dict(color='#00D2FF', width=4, shape='spline'),
-            hovertemplate='Pozisyon: %{x:.6f}<br>Funding: %{y:.6f}%<extra></extra>',
-            fill='tonexty'
-        )
-    )
-    
-    if funding_bolgeleri:
-        renk_paleti = [
-            '#FFE5E5',  
-            '#FFE5CC',  
-            '#E5F3FF',
-            '#E5FFE5', 
-            '#F0E5FF'  
-        ]
-        
-        for i, bolge in enumerate(funding_bolgeleri):
-            renk = renk_paleti[i % len(renk_paleti)]
-            
-            fig_slider.add_vrect(
-                x0=bolge['baslangic'], 
-                x1=bolge['bitis'],
-                fillcolor=renk,
-                opacity=0.4,
-                layer="below",
-                line_width=0
-            )
-            
-            orta_x = (bolge['baslangic'] + bolge['bitis']) / 2
-            max_y = max(combined_curve)
-            
-            fig_slider.add_annotation(
-                x=orta_x,
-                y=max_y * 0.9,
-                text=f"<b>{bolge['saat']}h</b><br>{bolge['etiket'].split('(')[0].strip()}",
-                showarrow=False,
-                font=dict(size=11, color='#2C3E50'),
-                bgcolor="rgba(255,255,255,0.8)",
-                bordercolor="#BDC3C7",
-                borderwidth=1,
-                borderpad=4
-            )
+    # Eğri ve bölgeler değişmedikçe taban grafik yeniden kurulmaz, yalnızca seçili nokta eklenir
+    fig_slider = go.Figure(_slider_taban_grafigi(x_degerleri, combined_curve, funding_bolgeleri))
     
     fig_slider.add_vline(
         x=pozisyon,
@@ -404,39 +499,6 @@ def pozisyon_slider_widget(x_degerleri, combined_curve, parametreler):
         )
     )
     
-    fig_slider.add_hline(y=0, line_color='white', line_width=2, opacity=0.8)
-    
-    fig_slider.update_layout(
-        title=dict(
-            text="<b>Seçilen Pozisyonda Dinamik Funding</b>",
-            x=0.5,
-            font=dict(size=16, color='white')
-        ),
-        xaxis_title="Pozisyon Oranı (0=Short, 1=Long)",
-        yaxis_title="Funding Oranı (%)",
-        height=400,
-        template="plotly_dark",
-        showlegend=False,
-        paper_bgcolor='#1a1a1a',
-        plot_bgcolor='#2d2d2d',
-        margin=dict(t=60, b=60, l=60, r=60),
-        font=dict(family="Arial", size=12, color='white')
-    )
-    
-    fig_slider.update_xaxes(
-        range=[0, 1], 
-        tickformat='.3f',
-        gridcolor='rgba(255,255,255,0.2)',
-        title_font=dict(size=14, color='white'),
-        tickfont=dict(color='white')
-    )
-    fig_slider.update_yaxes(
-        tickformat='.4f',
-        gridcolor='rgba(255,255,255,0.2)',
-        title_font=dict(size=14, color='white'),
-        tickfont=dict(color='white')
-    )
-    
     st.plotly_chart(fig_slider, use_container_width=True)
     
     return pozisyon, funding_orani, saat_dilimi
@@ -448,8 +510,7 @@ def parametre_duyarlilik_grafigi_yeni(temel_x, temel_y, varyasyon_verileri, para
     
     fig.add_trace(
         go.Scatter(
-            x=temel_x,
-            y=temel_y,
+            **iz_verisi(temel_x, temel_y),
             mode='lines',
             name='Mevcut Ayar',
             line=dict(color=RENKLER['zero_line'], width=4),
@@ -461,8 +522,7 @@ def parametre_duyarlilik_grafigi_yeni(temel_x, temel_y, varyasyon_verileri, para
     for i, (parametre_degeri, degerler) in enumerate(varyasyon_verileri.items()):
         fig.add_trace(
             go.Scatter(
-                x=temel_x,
-                y=degerler,
+                **iz_verisi(temel_x, degerler),
                 mode='lines',
                 name=f'{parametre_ismi} = {parametre_degeri:.3f}',
                 line=dict(color=renkler[i % len(renkler)], width=2, dash='dash'),
@@ -496,8 +556,7 @@ def cap_etkisi_grafigi(x_degerleri, orijinal_curve, capli_curve, min_cap, max_ca
     
     fig.add_trace(
         go.Scatter(
-            x=x_degerleri,
-            y=orijinal_curve,
+            **iz_verisi(x_degerleri, orijinal_curve),
             mode='lines',
             name='Cap\'siz Orijinal',
             line=dict(color=RENKLER['neutral'], width=2, dash='dot'),
@@ -507,8 +566,7 @@ def cap_etkisi_grafigi(x_degerleri, orijinal_curve, capli_curve, min_cap, max_ca
     
     fig.add_trace(
         go.Scatter(
-            x=x_degerleri,
-            y=capli_curve,
+            **iz_verisi(x_degerleri, capli_curve),
             mode='lines',
             name='Cap Uygulanmış',
             line=dict(color=RENKLER['combined_curve'], width=3)
@@ -591,8 +649,7 @@ def karsilastirma_grafigi_olustur_yeni(x_degerleri, senaryo_verileri):
     for i, (isim, degerler) in enumerate(senaryo_verileri.items()):
         fig.add_trace(
             go.Scatter(
-                x=x_degerleri,
-                y=degerler,
+                **iz_verisi(x_degerleri, degerler),
                 mode='lines',
                 name=isim,
                 line=dict(color=renkler[i % len(renkler)], width=3),
@@ -625,8 +682,7 @@ def gecis_bolgesi_detay_grafigi_yeni(x_degerleri, combined_curve, gecis_bilgiler
     
     fig.add_trace(
         go.Scatter(
-            x=x_degerleri,
-            y=combined_curve,
+            **iz_verisi(x_degerleri, combined_curve),
             mode='lines',
             name='Funding Oranı',
             line=dict(color=RENKLER['combined_curve'], width=4)